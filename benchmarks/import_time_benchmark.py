@@ -0,0 +1,72 @@
+"""
+Import-time regression benchmark.
+Imports meta_config_wiz in fresh interpreters and fails if:
+* the best cold import time is over the budget
+* importing the package imports one of the heavy backends, which should be imported only when a strategy or runner that needs them is selected
+* importing the package touches files in the working directory
+* importing the package configures logging handlers, which is left to the first search or to the application
+
+usage: python benchmarks/import_time_benchmark.py [--budget SECONDS] [--repeats N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES: list[str] = ['numpy', 'scipy', 'sklearn', 'bayes_opt', 'tqdm']
+PACKAGE_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT: str = f"""
+import json, logging, sys, time
+start = time.perf_counter()
+import meta_config_wiz
+elapsed = time.perf_counter() - start
+log_handlers = [type(handler).__name__ for name in ['', *logging.root.manager.loggerDict] for handler in getattr(logging.getLogger(name), 'handlers', [])]
+print(json.dumps({{"time": elapsed, "heavy_modules": [module for module in {HEAVY_MODULES!r} if module in sys.modules], "log_handlers": log_handlers}}))
+"""
+
+
+def measure_import(working_dir: str) -> dict:
+    """ import the package in a fresh interpreter, return the import time and the heavy modules it imported """
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [PACKAGE_ROOT, os.environ.get('PYTHONPATH')]))}
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], cwd=working_dir, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=0.5, help='maximal cold import time in seconds')
+    parser.add_argument('--repeats', type=int, default=5, help='number of fresh interpreters, the best time is compared to the budget')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as working_dir:
+        # a stale log file of a previous run must survive the import
+        log_filepath = os.path.join(working_dir, 'config_wiz_logs.json')
+        with open(log_filepath, 'w') as f:
+            f.write('[]')
+        results = [measure_import(working_dir) for _ in range(args.repeats)]
+        files_after_import = sorted(os.listdir(working_dir))
+
+    best_time = min(result['time'] for result in results)
+    heavy_modules = sorted({module for result in results for module in result['heavy_modules']})
+    log_handlers = sorted({handler for result in results for handler in result['log_handlers']})
+    print(f"best import time: {best_time:.3f}s (budget {args.budget:.3f}s)")
+
+    failures: list[str] = []
+    if best_time > args.budget:
+        failures.append(f"import time {best_time:.3f}s is over the budget of {args.budget:.3f}s")
+    if heavy_modules:
+        failures.append(f"importing the package imported {heavy_modules}")
+    if log_handlers:
+        failures.append(f"importing the package configured the log handlers {log_handlers}")
+    if files_after_import != ['config_wiz_logs.json']:
+        failures.append(f"importing the package changed the working directory: {files_after_import}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
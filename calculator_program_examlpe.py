@@ -3,6 +3,7 @@ from typing import Literal
 import numpy as np
 
 from meta_config_wiz import MetaPromptWiz
+from meta_config_wiz.configuration_utils import conditional_field
 
 import logging
 logging.basicConfig(level=logging.INFO)
@@ -15,11 +16,12 @@ output_type = float
 # Define the program configuration class
 class MyConfiguration(BaseModel):
     calculation_mode: Literal["linear", "quadratic"] = "linear"
-    linear_factor: float = Field(default=1.0, ge=0.0, le=10)  # Multiplier for linear calculations
-    quadratic_factor: float = Field(default=0.5, ge=0.0, le=10)  # Multiplier for quadratic terms
+    # each factor is used by a single calculation mode. declaring them as conditional fields makes the strategies set the unused factor to 0,
+    # instead of generating configurations that the validator below rejects
+    linear_factor: float = conditional_field(active_if={"calculation_mode": ["linear"]}, inactive_value=0.0, default=1.0, ge=0.0, le=10)  # Multiplier for linear calculations
+    quadratic_factor: float = conditional_field(active_if={"calculation_mode": ["quadratic"]}, inactive_value=0.0, default=0.5, ge=0.0, le=10)  # Multiplier for quadratic terms
     offset: float = Field(default=6, gt=0, lt=10)  # Constant term added to the result
 
-    # note that using that validator will make most of the configurations invalid. We skip them, so we will have to use a high value of max_runs
     @model_validator(mode='after')
     @classmethod
     def set_unused_factor_to_zero(cls, config):
@@ -70,6 +72,6 @@ my_dataset: list[tuple[input_type, output_type]] = generate_biased_dataset(size=
 
 # Create a ConfigWiz instance and find the best configuration
 my_config_wiz = MetaPromptWiz[MyConfiguration, input_type, output_type](config_class=MyConfiguration, program=my_program)
-best_configuration: MyConfiguration = my_config_wiz.find_best_configuration(dataset=my_dataset, scoring_function=my_scorer, program_runner_name='AllMean', strategy_name='GridStrategy', max_runs=4000)
+best_configuration: MyConfiguration = my_config_wiz.find_best_configuration(dataset=my_dataset, scoring_function=my_scorer, program_runner_name='AllMean', strategy_name='GridStrategy', max_runs=400)
 for field, value in best_configuration.model_dump().items():
     print(f"{field}: {value}")
@@ -0,0 +1,55 @@
+from typing import Type
+
+import numpy as np
+from pydantic import BaseModel
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.inspection import permutation_importance
+
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy
+
+
+def strategy_observations(strategy: AbstractStrategy) -> tuple[list[BaseModel], list[float]]:
+    """
+    :param strategy: a strategy after it ran
+    :return: (configurations, scores) evaluated by the strategy, including its prior observations
+    """
+    configs: list[BaseModel] = strategy.configs + strategy.prior_configs
+    scores: list[float] = strategy.scores + strategy.prior_scores
+    return configs, scores
+
+
+def encode_configs(config_class: Type[BaseModel], configs: list[BaseModel]) -> np.ndarray:
+    """
+    :return: matrix with a column per field. numeric fields keep their value, bool and Literal fields are encoded as the index of their value
+    """
+    columns: list[list[float]] = []
+    for field_name, field_info in config_class.model_fields.items():
+        if field_info.annotation.__name__ in ["float", "int", "bool"]:
+            columns.append([float(getattr(config, field_name)) for config in configs])
+        else:
+            possible_values: tuple = field_info.annotation.__args__
+            columns.append([float(possible_values.index(getattr(config, field_name))) for config in configs])
+    return np.array(columns).T
+
+
+def parameter_importance(strategy: AbstractStrategy, n_repeats: int = 10, random_state: int = 1) -> dict[str, float]:
+    """
+    Permutation importance of every field of the configuration class.
+    A random forest is fitted on the (configurations, scores) of the strategy, and the importance of a field is the
+    drop of the forest's R^2 when the values of the field are shuffled. Importances are clipped at 0 and normalized to sum to 1.
+    :param strategy: a strategy after it ran
+    :param n_repeats: number of shuffles of every field
+    :param random_state: seed of the forest and the shuffles
+    :return: field name to its importance, most important first
+    :raises AssertionError: if the strategy has less than 2 observations
+    """
+    configs, scores = strategy_observations(strategy)
+    assert len(configs) >= 2, "at least 2 evaluated configurations are needed to compute importance"
+    field_names: list[str] = list(strategy.config_class_type.model_fields.keys())
+    features: np.ndarray = encode_configs(strategy.config_class_type, configs)
+    forest = RandomForestRegressor(n_estimators=100, random_state=random_state).fit(features, scores)
+    importances: np.ndarray = permutation_importance(forest, features, scores, n_repeats=n_repeats, random_state=random_state).importances_mean.clip(min=0)
+    if importances.sum() > 0:
+        importances = importances / importances.sum()
+    field2importance: dict[str, float] = dict(zip(field_names, importances.tolist()))
+    return dict(sorted(field2importance.items(), key=lambda item: item[1], reverse=True))
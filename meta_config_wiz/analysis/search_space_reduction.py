@@ -0,0 +1,47 @@
+from typing import Any, Type, Literal
+
+from pydantic import BaseModel, Field, create_model
+
+from meta_config_wiz.analysis.parameter_importance import parameter_importance, strategy_observations
+from meta_config_wiz.configuration_utils import get_numeric_param_min, get_numeric_param_max, get_field_condition, get_inactive_value
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy
+
+
+def reduce_search_space(strategy: AbstractStrategy, importances: dict[str, float] | None = None, importance_threshold: float = 0.05, top_fraction: float = 0.25) -> Type[BaseModel]:
+    """
+    Builds a smaller configuration class for follow-up searches, based on the results of a strategy:
+    * fields with importance below importance_threshold are pinned to their value in the best configuration
+    * numeric fields above the threshold are narrowed to the range of their values in the top_fraction best configurations
+    * categorical fields above the threshold keep all their values
+    * conditional fields keep their condition, and their inactive value is kept next to the pinned value or inside the narrowed range
+    The reduced class subclasses the original one, so its validators still apply and programs can use it as the original class.
+    :param strategy: a strategy after it ran
+    :param importances: field name to importance. computed with parameter_importance if not given
+    :param importance_threshold: fields with lower importance are pinned
+    :param top_fraction: fraction of the best configurations whose values define the narrowed numeric ranges
+    :return: the reduced configuration class
+    """
+    config_class: Type[BaseModel] = strategy.config_class_type
+    importances = importances if importances is not None else parameter_importance(strategy)
+    best_config: BaseModel = strategy.choose_best_config()
+    configs, scores = strategy_observations(strategy)
+    ranked_configs: list[BaseModel] = [config for _, config in sorted(zip(scores, configs), key=lambda pair: pair[0], reverse=True)]
+    top_configs: list[BaseModel] = ranked_configs[:max(1, int(len(ranked_configs) * top_fraction))]
+
+    fields: dict[str, Any] = {}
+    for field_name, field_info in config_class.model_fields.items():
+        best_value: Any = getattr(best_config, field_name)
+        # conditional fields keep their condition, and their inactive value stays a possible value
+        is_conditional: bool = get_field_condition(config_class, field_name) is not None
+        kept_values: list[Any] = [best_value, get_inactive_value(config_class, field_name)] if is_conditional else [best_value]
+        field_kwargs: dict[str, Any] = {'default': best_value, 'description': field_info.description, 'json_schema_extra': field_info.json_schema_extra}
+        if importances.get(field_name, 0.0) < importance_threshold:
+            # pin the field to a single value
+            fields[field_name] = (Literal[tuple(dict.fromkeys(kept_values))], Field(**field_kwargs))
+        elif field_info.annotation.__name__ in ["float", "int"]:
+            # narrow the range to the values of the top configurations, within the original range
+            top_values: list[Any] = [getattr(config, field_name) for config in top_configs] + kept_values
+            min_value: int | float = max(min(top_values), get_numeric_param_min(config_class, field_name))
+            max_value: int | float = min(max(top_values), get_numeric_param_max(config_class, field_name))
+            fields[field_name] = (field_info.annotation, Field(ge=min_value, le=max_value, **field_kwargs))
+    return create_model(f"Reduced{config_class.__name__}", __base__=config_class, **fields)
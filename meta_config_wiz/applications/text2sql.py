@@ -1,6 +1,7 @@
 from pydantic import model_validator
 from typing import Literal, Dict
 from meta_config_wiz.models.configurations import Configuration
+from meta_config_wiz.configuration_utils import conditional_field
 from meta_config_wiz.models.scores import ConfigurationScore, EvaluationScore
 from pydantic import BaseModel
 
@@ -18,12 +19,13 @@ class Text2SQLConfiguration(Configuration):
     """
 
     prompt_style: Literal["InstructiveStyle", "DailSqlStyle", "ConciseStyle"]
+    # ConciseStyle does not use examples, so the examples fields are searched only for the other prompt styles
     example_selector: Literal[
         "RandomExampleSelector",
         "MaxMarginalRelevanceExampleSelector",
         "SemanticSimilarityExampleSelector",
-    ]
-    examples_number: Literal[1, 10, 20, 40]
+    ] = conditional_field(active_if={"prompt_style": ["InstructiveStyle", "DailSqlStyle"]}, inactive_value="RandomExampleSelector")
+    examples_number: Literal[1, 10, 20, 40] = conditional_field(active_if={"prompt_style": ["InstructiveStyle", "DailSqlStyle"]}, inactive_value=1)
     error_correction: bool
     llm: Literal["gpt_35", "gpt_4"]
 
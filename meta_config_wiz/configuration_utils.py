@@ -1,7 +1,7 @@
-from typing import Any, Type, get_args
-import numpy as np
+from typing import Any, Type, Literal, get_args
+import math
 from annotated_types import Gt, Ge, Lt, Le
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import random
 
 
@@ -18,6 +18,86 @@ def validate_model_field_types(model: BaseModel | Type[BaseModel], allowed_types
         assert field_type_name in allowed_types, f"Field {field_name} has an invalid type {field_type_name}."
 
 
+def conditional_field(active_if: dict[str, list[Any]], inactive_value: Any, **field_kwargs) -> Any:
+    """
+    Declares a conditional field: the field is active only when every parent field in `active_if` takes one of the listed values
+    (and the parent is active itself). Strategies set inactive fields to `inactive_value` and do not search over them,
+    so impossible combinations are not generated and equivalent configurations collapse into one.
+    example: examples_number: Literal[1, 10] = conditional_field(active_if={'prompt_style': ['InstructiveStyle']}, inactive_value=1)
+    :param active_if: parent field name to the parent values for which the field is active
+    :param inactive_value: the value of the field when it is not active. must pass the model validators
+    :param field_kwargs: kwargs to pass to pydantic Field, e.g. ge and le
+    :return: pydantic field
+    """
+    return Field(json_schema_extra={'active_if': active_if, 'inactive_value': inactive_value}, **field_kwargs)
+
+
+def get_field_condition(model: BaseModel | Type[BaseModel], param: str) -> dict[str, list[Any]] | None:
+    """
+    :return: the activation condition of a field declared with conditional_field, None for unconditional fields
+    """
+    json_schema_extra = model.model_fields[param].json_schema_extra
+    return json_schema_extra.get('active_if') if isinstance(json_schema_extra, dict) else None
+
+
+def get_inactive_value(model: BaseModel | Type[BaseModel], param: str) -> Any:
+    """
+    :return: the value of a conditional field when it is not active: its inactive_value, or its default
+    :raises AssertionError: if the field has neither
+    """
+    field_info = model.model_fields[param]
+    if isinstance(field_info.json_schema_extra, dict) and 'inactive_value' in field_info.json_schema_extra:
+        return field_info.json_schema_extra['inactive_value']
+    assert not field_info.is_required(), f"Conditional field {param} must have an inactive_value or a default."
+    return field_info.default
+
+
+def is_field_active(model: BaseModel | Type[BaseModel], param: str, config_dict: dict[str, Any]) -> bool:
+    """
+    :param config_dict: dictionary of a configuration
+    :return: True if the field is active in the configuration: it is unconditional, or all its parents are active and take one of their activating values
+    """
+    condition: dict[str, list[Any]] | None = get_field_condition(model, param)
+    if condition is None:
+        return True
+    return all(config_dict.get(parent) in values and is_field_active(model, parent, config_dict) for parent, values in condition.items())
+
+
+def canonicalize_config_dict(model: BaseModel | Type[BaseModel], config_dict: dict[str, Any]) -> dict[str, Any]:
+    """
+    Sets the inactive fields of a configuration dictionary to their inactive value, so equivalent configurations get the same dictionary
+    :param config_dict: dictionary of a configuration
+    :return: canonical dictionary of the configuration
+    """
+    return {param: value if is_field_active(model, param, config_dict) else get_inactive_value(model, param) for param, value in config_dict.items()}
+
+
+def config_dict_key(config_dict: dict[str, Any]) -> tuple:
+    """
+    :return: hashable key of a configuration dictionary, used to find duplicate configurations
+    """
+    return tuple(sorted(config_dict.items()))
+
+
+def validate_model_conditions(model: BaseModel | Type[BaseModel]) -> None:
+    """
+    Validates the conditional fields of a Pydantic model: parents exist, conditions have no cycles, and inactive values are defined.
+    :raises AssertionError: If a condition is invalid
+    """
+    def validate_field(param: str, path: list[str]) -> None:
+        assert param not in path, f"Conditional fields have a cycle: {' -> '.join(path + [param])}"
+        condition: dict[str, list[Any]] | None = get_field_condition(model, param)
+        if condition is None:
+            return
+        get_inactive_value(model, param)
+        for parent in condition:
+            assert parent in model.model_fields, f"Field {param} depends on {parent}, which is not a field of {model}."
+            validate_field(parent, path + [param])
+
+    for field_name in model.model_fields:
+        validate_field(field_name, [])
+
+
 def get_numeric_param_max(model: BaseModel | Type[BaseModel], param: str) -> int | float:
     """
     Gets the maximum value of a parameter in a Pydantic model.
@@ -72,6 +152,27 @@ def get_numeric_param_min(model: BaseModel | Type[BaseModel], param: str) -> int
         raise ValueError(f"Parameter {param} is not int or float.")
 
 
+def get_categorical_param_values(model: BaseModel | Type[BaseModel], param: str) -> list[Any]:
+    """
+    Gets the possible values of a categorical parameter in a Pydantic model.
+    for bool parameter we return [False, True]
+    for Literal parameter we return the literal values
+    :param model: The Pydantic model class.
+    :param param: The parameter name.
+    :return: The possible values of the parameter.
+    :raises AssertionError: If the parameter is not found in the model.
+    :raises ValueError: If the parameter is not categorical
+    """
+    assert param in model.model_fields, f"Parameter {param} not found in model {model}. existing parameters: {list(model.model_fields.keys())}"
+    field_info = model.model_fields[param]
+    if field_info.annotation.__name__ == 'bool':
+        return [False, True]
+    elif field_info.annotation.__name__ == 'Literal':
+        return list(get_args(field_info.annotation))
+    else:
+        raise ValueError(f"Parameter {param} is not bool or Literal.")
+
+
 def model_key2k_possible_values(model: BaseModel | Type[BaseModel], k: int) -> dict[str, list[Any]]:
     """
     Generates `k` example values for each key in the configuration.
@@ -80,6 +181,8 @@ def model_key2k_possible_values(model: BaseModel | Type[BaseModel], k: int) -> d
     :return: A dictionary with keys as the configuration keys and values as lists of `k` example values.
     :raises AssertionError: If `k` is less than or equal to 0.
     """
+    import numpy as np  # imported here, so validating a configuration class on import does not import numpy
+
     assert k > 0, "k must be greater than 0"
     # init empty dictionary to store possible values for each key
     key2possible_values: dict[str, list[Any]] = {}
@@ -111,3 +214,47 @@ def model_key2k_possible_values(model: BaseModel | Type[BaseModel], k: int) -> d
 
     # return dictionary with possible values for each key
     return key2possible_values
+
+
+def low_discrepancy_config_dicts(model: BaseModel | Type[BaseModel], n: int, method: Literal['sobol', 'lhs'] = 'sobol', seed: int = 42) -> list[dict[str, Any]]:
+    """
+    Generates up to `n` distinct canonical configuration dictionaries that cover the space evenly, using a scrambled Sobol sequence or a Latin hypercube.
+    Every field is a dimension of the unit cube: numeric fields are scaled to their range (int fields are split to equal bins for every integer),
+    bool and Literal fields are split to equal bins for every possible value.
+    Points that are equivalent after canonicalization are dropped, and new designs are drawn to replace them.
+    :param model: pydantic model
+    :param n: number of configuration dictionaries
+    :param method: 'sobol' for a scrambled Sobol sequence, 'lhs' for a Latin hypercube
+    :param seed: seed of the scrambling
+    :return: list of at most `n` configuration dictionaries, fewer if the space has fewer distinct configurations
+    """
+    from scipy.stats import qmc  # imported here, so scipy is imported only when a low discrepancy design is used
+
+    field_names: list[str] = list(model.model_fields.keys())
+    config_dicts: list[dict[str, Any]] = []
+    seen_config_keys: set[tuple] = set()
+    for attempt in range(10):  # a few more designs to replace points that collapsed, in small spaces all designs collapse
+        if method == 'sobol':
+            points = qmc.Sobol(d=len(field_names), scramble=True, seed=seed + attempt).random_base2(m=max(0, math.ceil(math.log2(n))))
+        else:
+            points = qmc.LatinHypercube(d=len(field_names), seed=seed + attempt).random(n=n)
+        for point in points:
+            config_dict: dict[str, Any] = {}
+            for field_name, u in zip(field_names, point.tolist()):
+                match model.model_fields[field_name].annotation.__name__:
+                    case 'float':
+                        min_value, max_value = get_numeric_param_min(model, field_name), get_numeric_param_max(model, field_name)
+                        config_dict[field_name] = min_value + u * (max_value - min_value)
+                    case 'int':
+                        min_value, max_value = get_numeric_param_min(model, field_name), get_numeric_param_max(model, field_name)
+                        config_dict[field_name] = min(min_value + int(u * (max_value - min_value + 1)), max_value)
+                    case _:
+                        possible_values: list[Any] = get_categorical_param_values(model, field_name)
+                        config_dict[field_name] = possible_values[min(int(u * len(possible_values)), len(possible_values) - 1)]
+            config_dict = canonicalize_config_dict(model, config_dict)
+            if config_dict_key(config_dict) not in seen_config_keys:
+                seen_config_keys.add(config_dict_key(config_dict))
+                config_dicts.append(config_dict)
+            if len(config_dicts) >= n:
+                return config_dicts
+    return config_dicts
@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from random import Random
+from typing import TypeVar, Generic, Any
+
+InputType = TypeVar("InputType", bound=Any)
+OutputType = TypeVar("OutputType", bound=Any)
+
+
+class AbstractDatasetReducer(ABC, Generic[InputType, OutputType]):
+    """
+    Abstract base class for selecting a representative subset of the dataset before running the strategy
+
+    The subset and its order are computed once and shared by all configurations,
+    so every configuration is evaluated on the same samples and configurations can be compared sample by sample
+    """
+
+    def __init__(self, sample_size: int, random_state: int = 42):
+        assert sample_size > 0, "sample_size must be greater than 0"
+        self.sample_size: int = sample_size
+        self.random_state: int = random_state
+
+    @abstractmethod
+    def select_indices(self, dataset: list[tuple[InputType, OutputType]]) -> list[int]:
+        """
+        :param dataset: dataset of [(input, truth_output)]
+        :return: indices of the selected samples, at most sample_size of them
+        """
+        pass
+
+    def reduce_indices(self, dataset: list[tuple[InputType, OutputType]]) -> list[int]:
+        """
+        :param dataset: dataset of [(input, truth_output)]
+        :return: indices of the selected samples, in a fixed order determined by random_state. all the indices if the dataset is not larger than sample_size
+        """
+        if len(dataset) <= self.sample_size:
+            return list(range(len(dataset)))
+        indices: list[int] = sorted(self.select_indices(dataset))
+        Random(self.random_state).shuffle(indices)
+        return indices
+
+    def reduce(self, dataset: list[tuple[InputType, OutputType]]) -> list[tuple[InputType, OutputType]]:
+        """
+        :param dataset: dataset of [(input, truth_output)]
+        :return: the selected samples, in the order of reduce_indices. the whole dataset if it is not larger than sample_size
+        """
+        return [dataset[index] for index in self.reduce_indices(dataset)]
@@ -0,0 +1,30 @@
+from typing import Callable, Generic, Sequence
+
+import numpy as np
+from sklearn.cluster import KMeans
+
+from meta_config_wiz.dataset_reduction.abstract_dataset_reducer import AbstractDatasetReducer, InputType, OutputType
+
+
+class CoresetDatasetReducer(AbstractDatasetReducer[InputType, OutputType], Generic[InputType, OutputType]):
+    """
+    cluster the samples by user supplied features (e.g. question embeddings) into sample_size clusters,
+    and select the sample closest to the center of each cluster
+    """
+
+    def __init__(self, sample_size: int, feature_function: Callable[[InputType, OutputType], Sequence[float]], random_state: int = 42):
+        """
+        :param sample_size: number of samples to select
+        :param feature_function: function that takes an input and its truth output, and returns a feature vector of the sample
+        :param random_state: seed of the clustering
+        """
+        super().__init__(sample_size=sample_size, random_state=random_state)
+        self.feature_function: Callable[[InputType, OutputType], Sequence[float]] = feature_function
+
+    def select_indices(self, dataset: list[tuple[InputType, OutputType]]) -> list[int]:
+        features = np.array([self.feature_function(input, truth_output) for input, truth_output in dataset], dtype=float)
+        kmeans = KMeans(n_clusters=self.sample_size, n_init='auto', random_state=self.random_state).fit(features)
+        distances = kmeans.transform(features)  # distance of every sample from every cluster center
+
+        # the closest sample to each center. a sample can be the closest to two centers, so the result may be a bit smaller than sample_size
+        return list(set(np.argmin(distances, axis=0).tolist()))
@@ -0,0 +1,22 @@
+from typing import Literal, Any
+
+from meta_config_wiz.dataset_reduction.abstract_dataset_reducer import AbstractDatasetReducer
+
+
+def dataset_reducer_factory(dataset_reducer_name: Literal['Stratified', 'Coreset'], dataset_reducer_kwargs: dict[str, Any] | None = None) -> AbstractDatasetReducer:
+    """
+    Factory method for creating dataset reducer instances
+    :param dataset_reducer_name: name of the dataset reducer to create
+    :param dataset_reducer_kwargs: kwargs to pass to the dataset reducer, e.g. sample_size and stratify_function or feature_function
+    :return: instance of the dataset reducer
+    """
+    # dataset reducers are imported only when selected, so sklearn is not imported with the package
+    match dataset_reducer_name:
+        case 'Stratified':
+            from meta_config_wiz.dataset_reduction.stratified_dataset_reducer import StratifiedDatasetReducer
+            return StratifiedDatasetReducer(**(dataset_reducer_kwargs or {}))
+        case 'Coreset':
+            from meta_config_wiz.dataset_reduction.coreset_dataset_reducer import CoresetDatasetReducer
+            return CoresetDatasetReducer(**(dataset_reducer_kwargs or {}))
+        case _:
+            raise ValueError(f"Unknown dataset reducer name: {dataset_reducer_name}")
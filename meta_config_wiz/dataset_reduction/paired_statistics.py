@@ -0,0 +1,51 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class PairedComparison(BaseModel):
+    """
+    Paired comparison of two configurations that were evaluated on the same samples
+    mean_difference - mean of (score_a - score_b) over the samples both configurations scored
+    t_statistic, p_value - paired t-test of the difference
+    wilcoxon_p_value - Wilcoxon signed-rank test of the difference, None if all differences are zero
+    samples_number - number of samples both configurations scored
+    """
+    mean_difference: float
+    t_statistic: float
+    p_value: float
+    wilcoxon_p_value: float | None
+    samples_number: int
+
+
+def score_to_float(score: Any) -> float:
+    """ numeric value of a sample score. ConfigurationScore objects support division, and dividing them returns a float """
+    return float(score / 1)
+
+
+def paired_comparison(scores_a: list[Any], scores_b: list[Any]) -> PairedComparison:
+    """
+    Compares the per-sample scores of two configurations evaluated on the same samples, in the same order.
+    Samples that one of the configurations did not score (None) are left out.
+    :param scores_a: per-sample scores of the first configuration
+    :param scores_b: per-sample scores of the second configuration
+    :return: paired statistics of score_a - score_b
+    :raises AssertionError: if the score lists are not aligned or there are less than 2 common samples
+    """
+    from scipy import stats  # imported here, so importing the package does not import scipy
+
+    assert len(scores_a) == len(scores_b), f"configurations were scored on different samples ({len(scores_a)} and {len(scores_b)} samples)"
+    pairs: list[tuple[float, float]] = [(score_to_float(a), score_to_float(b)) for a, b in zip(scores_a, scores_b) if a is not None and b is not None]
+    assert len(pairs) >= 2, "at least 2 samples scored by both configurations are needed"
+    values_a, values_b = [a for a, _ in pairs], [b for _, b in pairs]
+    differences: list[float] = [a - b for a, b in pairs]
+
+    t_test = stats.ttest_rel(values_a, values_b)
+    wilcoxon_p_value: float | None = None if all(difference == 0 for difference in differences) else float(stats.wilcoxon(values_a, values_b).pvalue)
+    return PairedComparison(
+        mean_difference=sum(differences) / len(differences),
+        t_statistic=float(t_test.statistic),
+        p_value=float(t_test.pvalue),
+        wilcoxon_p_value=wilcoxon_p_value,
+        samples_number=len(pairs),
+    )
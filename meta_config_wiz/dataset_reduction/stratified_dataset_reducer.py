@@ -0,0 +1,38 @@
+from collections import defaultdict
+from random import Random
+from typing import Callable, Generic, Hashable
+
+from meta_config_wiz.dataset_reduction.abstract_dataset_reducer import AbstractDatasetReducer, InputType, OutputType
+
+
+class StratifiedDatasetReducer(AbstractDatasetReducer[InputType, OutputType], Generic[InputType, OutputType]):
+    """
+    split the dataset into strata by a user supplied function (e.g. question hardness), and sample each stratum in proportion to its size
+    """
+
+    def __init__(self, sample_size: int, stratify_function: Callable[[InputType, OutputType], Hashable], random_state: int = 42):
+        """
+        :param sample_size: number of samples to select
+        :param stratify_function: function that takes an input and its truth output, and returns the stratum of the sample
+        :param random_state: seed of the sampling inside each stratum
+        """
+        super().__init__(sample_size=sample_size, random_state=random_state)
+        self.stratify_function: Callable[[InputType, OutputType], Hashable] = stratify_function
+
+    def select_indices(self, dataset: list[tuple[InputType, OutputType]]) -> list[int]:
+        stratum2indices: dict[Hashable, list[int]] = defaultdict(list)
+        for index, (input, truth_output) in enumerate(dataset):
+            stratum2indices[self.stratify_function(input, truth_output)].append(index)
+
+        # proportional allocation, the samples left by rounding down go to the strata with the largest remainders
+        exact_sizes: dict[Hashable, float] = {stratum: len(indices) * self.sample_size / len(dataset) for stratum, indices in stratum2indices.items()}
+        stratum2size: dict[Hashable, int] = {stratum: int(size) for stratum, size in exact_sizes.items()}
+        by_remainder: list[Hashable] = sorted(exact_sizes, key=lambda stratum: exact_sizes[stratum] - stratum2size[stratum], reverse=True)
+        for stratum in by_remainder[:self.sample_size - sum(stratum2size.values())]:
+            stratum2size[stratum] += 1
+
+        rng = Random(self.random_state)
+        selected_indices: list[int] = []
+        for stratum, indices in stratum2indices.items():
+            selected_indices.extend(rng.sample(indices, stratum2size[stratum]))
+        return selected_indices
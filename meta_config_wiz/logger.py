@@ -2,7 +2,6 @@ import json
 import logging
 from time import time
 from typing import List, Any, Dict
-import os
 
 class MyHandler(logging.Handler):
     """
@@ -10,6 +9,9 @@ class MyHandler(logging.Handler):
     * adds time taken to each log
     * saves logs in a list that is a global variable
     * writes logs in a file
+
+    the file is only touched when the first log is emitted, so importing the package has no side effects on disk.
+    the first write replaces the logs of a previous run
     """
 
     def __init__(self, log_list: List[Any], log_filepath: str = 'config_wiz_logs.json'):
@@ -17,8 +19,6 @@ class MyHandler(logging.Handler):
         self.log_list: List[Dict[str, str | float]] = log_list
         self.log_filepath = log_filepath
         self.prev_time = time()
-        if os.path.exists(self.log_filepath):
-            os.remove(self.log_filepath)
 
     def emit(self, record):
         # add time taken to the log
@@ -33,18 +33,17 @@ class MyHandler(logging.Handler):
             json.dump(log_list, f, indent=4)
 
 
-def setup_logger() -> None:
+def setup_logger(log_filepath: str = 'config_wiz_logs.json') -> None:
     """
     almost entirely copied from here https://docs.python.org/3/howto/logging.html
-    :return: logger
+    called by the first search rather than on import, so importing the package does not configure logging. does nothing if the logger is already set up
+    :param log_filepath: file the logs are written to
     """
-    global logger, log_list
-    # create logger
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
+    if any(isinstance(handler, MyHandler) for handler in logger.handlers):
+        return
 
     # handler that would format the logs and save them in a list
-    handler = MyHandler(log_list)
+    handler = MyHandler(log_list, log_filepath=log_filepath)
 
     # create formatter to the handler
     formatter = logging.Formatter('%(message)s')
@@ -58,6 +57,4 @@ def setup_logger() -> None:
 
 
 log_list: List[Dict[str, Any]] = list()
-logger: logging.Logger
-setup_logger()
-
+logger: logging.Logger = logging.getLogger(__name__)
@@ -3,11 +3,16 @@ from typing import Callable, TypeVar, Generic, Type, Literal, Any
 
 from pydantic import BaseModel
 
-from meta_config_wiz.configuration_utils import validate_model_field_types
+from meta_config_wiz.configuration_utils import validate_model_field_types, validate_model_conditions
 from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy
 from meta_config_wiz.strategy.strategy_factory import strategy_factory
 from meta_config_wiz.program_runner.program_runner import ProgramRunner
 from meta_config_wiz.program_runner.program_runner_factory import program_runner_factory
+from meta_config_wiz.dataset_reduction.dataset_reducer_factory import dataset_reducer_factory
+from meta_config_wiz.dataset_reduction.paired_statistics import PairedComparison, paired_comparison
+from meta_config_wiz.results_store.results_store import ResultsStore
+from meta_config_wiz.program_runner.runner_session import RunnerSession
+from meta_config_wiz.logger import setup_logger
 
 ConfigType = TypeVar("ConfigType", bound=BaseModel)
 InputType = TypeVar("InputType")
@@ -17,21 +22,61 @@ OutputType = TypeVar("OutputType")
 class MetaPromptWiz(Generic[ConfigType, InputType, OutputType]):
     """
     * config_class: a subclass of Configuration
-    * program: a callable from (Configuration, InputType) to ResultType
+    * program: a callable from (Configuration, InputType) to ResultType, or an async function that is awaited on the event loop of the search
+    * log_file: the first search logs every configuration and score to this json file. None leaves the logging configuration to the application
     """
 
-    def __init__(self, config_class: Type[ConfigType], program: Callable[[BaseModel, InputType], OutputType]):
+    def __init__(self, config_class: Type[ConfigType], program: Callable[[BaseModel, InputType], OutputType], log_file: str | None = 'config_wiz_logs.json'):
         validate_model_field_types(model=config_class)
+        validate_model_conditions(model=config_class)
         self.config_class: ConfigType = config_class
         self.program: Callable[[ConfigType | dict, InputType], OutputType] = program
+        self.log_file: str | None = log_file
+        self.program_runner: ProgramRunner[InputType, OutputType] | None = None  # program runner of the last search, holds the per-sample scores of every configuration
+        self.strategy: AbstractStrategy[ConfigType] | None = None  # strategy of the last search, holds the evaluated configurations and their scores
+
+    def init_search(self,
+                    dataset: list[tuple[InputType, OutputType]],
+                    program_runner_name: Literal['AllMean', 'StreamingMean', 'Latency'],
+                    strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy', 'QuasiRandomStrategy', 'EvolutionaryStrategy'],
+                    max_runs: int,
+                    strategy_kwargs: dict[str, Any] | None,
+                    program_runner_kwargs: dict[str, Any] | None,
+                    dataset_reducer_name: Literal['Stratified', 'Coreset'] | None,
+                    dataset_reducer_kwargs: dict[str, Any] | None) -> tuple[list[tuple[InputType, OutputType]], ProgramRunner[InputType, OutputType], AbstractStrategy[ConfigType]]:
+        """
+        reduces the dataset and creates the program runner and the strategy of a search
+        :return: (dataset to evaluate on, program runner, strategy)
+        """
+        if self.log_file is not None:
+            setup_logger(log_filepath=self.log_file)
+
+        # reduce the dataset once, so all configurations share the same samples
+        dataset_indices: list[int] | None = None
+        if dataset_reducer_name is not None:
+            dataset_indices = dataset_reducer_factory(dataset_reducer_name=dataset_reducer_name, dataset_reducer_kwargs=dataset_reducer_kwargs).reduce_indices(dataset)
+            dataset = [dataset[index] for index in dataset_indices]
+
+        # init program_runner and strategy
+        program_runner: ProgramRunner[InputType, OutputType] = program_runner_factory(program_runner_name=program_runner_name, program_runner_kwargs=program_runner_kwargs)
+        program_runner.dataset_indices = dataset_indices  # the results store records the index of every sample in the original dataset
+        strategy: AbstractStrategy[ConfigType] = strategy_factory(strategy_name=strategy_name, config_class=self.config_class, max_runs=max_runs, strategy_kwargs=strategy_kwargs)
+        self.program_runner = program_runner
+        self.strategy = strategy
+        return dataset, program_runner, strategy
 
     def find_best_configuration(self,
                                 dataset: list[tuple[InputType, OutputType]],
                                 scoring_function: Callable[[OutputType, OutputType], Any] |  Callable[[OutputType], Any],
-                                program_runner_name: Literal['AllMean'] = 'AllMean',
-                                strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy'] = 'BayesianStrategy',
+                                program_runner_name: Literal['AllMean', 'StreamingMean', 'Latency'] = 'AllMean',
+                                strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy', 'QuasiRandomStrategy', 'EvolutionaryStrategy'] = 'BayesianStrategy',
                                 max_runs: int = 10,
-                                strategy_kwargs: dict[str, Any] | None = None) -> ConfigType:
+                                strategy_kwargs: dict[str, Any] | None = None,
+                                program_runner_kwargs: dict[str, Any] | None = None,
+                                dataset_reducer_name: Literal['Stratified', 'Coreset'] | None = None,
+                                dataset_reducer_kwargs: dict[str, Any] | None = None,
+                                checkpoint_file: str | None = None,
+                                session_kwargs: dict[str, Any] | None = None) -> ConfigType:
         """
         :param dataset: dataset of [(input, truth_output)]
         :param scoring_function: function that takes pred_output and expected_output, or just pred_output, and returns a score
@@ -39,51 +84,117 @@ class MetaPromptWiz(Generic[ConfigType, InputType, OutputType]):
         :param strategy_name: which strategy to use. determines how to choose the next configuration to test
         :param max_runs: max total runs to perform
         :param strategy_kwargs:  kwargs to pass to the strategy
+        :param program_runner_kwargs: kwargs to pass to the program runner, e.g. {'call_policy': CallPolicy(timeout=30, max_retries=3)}
+        :param dataset_reducer_name: which dataset reducer to use. None evaluates every configuration on the whole dataset.
+            otherwise all configurations are evaluated on the same representative subset, in the same order
+        :param dataset_reducer_kwargs: kwargs to pass to the dataset reducer, e.g. {'sample_size': 50, 'feature_function': embed}
+        :param checkpoint_file: if given, the evaluated configurations and their scores are saved to this json file.
+            pass strategy_kwargs={'prior_observations': load_observations(checkpoint_file)} to warm-start a later search
+        :param session_kwargs: kwargs to pass to the RunnerSession that lives for the whole search and is shared by all configurations,
+            e.g. {'max_workers': 16, 'worker_initializer': lambda: {'client': make_client()}}. the program gets the resources with worker_resources()
         :return:  best configuration
         """
-
-        # init program_runner and strategy
-        program_runner: ProgramRunner[InputType, OutputType] = program_runner_factory(program_runner_name=program_runner_name)
-        strategy: AbstractStrategy[ConfigType] = strategy_factory(strategy_name=strategy_name, config_class=self.config_class, max_runs=max_runs, strategy_kwargs=strategy_kwargs)
-        strategy.run_strategy(func=lambda config: program_runner.run(config=config, program=self.program, dataset=dataset, scoring_function=scoring_function))
+        dataset, program_runner, strategy = self.init_search(dataset=dataset, program_runner_name=program_runner_name, strategy_name=strategy_name, max_runs=max_runs, strategy_kwargs=strategy_kwargs,
+                                                             program_runner_kwargs=program_runner_kwargs, dataset_reducer_name=dataset_reducer_name, dataset_reducer_kwargs=dataset_reducer_kwargs)
+        with RunnerSession(**(session_kwargs or {})) as session:
+            program_runner.session = session
+            try:
+                strategy.run_strategy(func=lambda config: program_runner.run(config=config, program=self.program, dataset=dataset, scoring_function=scoring_function))
+            finally:
+                program_runner.session = None  # the session is closed with the search
+        if program_runner.results_store is not None:
+            program_runner.results_store.flush()
+        if checkpoint_file is not None:
+            strategy.save_observations(checkpoint_file)
         return strategy.choose_best_config()
 
-
-    def write_all_configurations_results(self,
-                                dataset: list[tuple[InputType, OutputType]],
-                                scorer: Callable[[OutputType, OutputType], float],
-                                program_runner_name: Literal['AllMean'] = 'AllMean',
-                                strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy'] = 'BayesianStrategy',
-                                max_runs: int = 10,
-                                strategy_kwargs: dict[str, Any] | None = None,
-                                results_file: str = 'results.json') -> None:
+    async def afind_best_configuration(self,
+                                       dataset: list[tuple[InputType, OutputType]],
+                                       scoring_function: Callable[[OutputType, OutputType], Any] | Callable[[OutputType], Any],
+                                       program_runner_name: Literal['AllMean', 'StreamingMean', 'Latency'] = 'AllMean',
+                                       strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy', 'QuasiRandomStrategy', 'EvolutionaryStrategy'] = 'BayesianStrategy',
+                                       max_runs: int = 10,
+                                       strategy_kwargs: dict[str, Any] | None = None,
+                                       program_runner_kwargs: dict[str, Any] | None = None,
+                                       dataset_reducer_name: Literal['Stratified', 'Coreset'] | None = None,
+                                       dataset_reducer_kwargs: dict[str, Any] | None = None,
+                                       checkpoint_file: str | None = None,
+                                       session_kwargs: dict[str, Any] | None = None) -> ConfigType:
         """
-        writes down all configurations and their results to a file
+        async version of find_best_configuration, for callers that already run an event loop (Jupyter, FastAPI, async services).
+        the program calls are scheduled on the caller's event loop instead of a new loop per configuration, and run in the executor of the session.
+        same parameters as find_best_configuration
+        :return:  best configuration
         """
+        dataset, program_runner, strategy = self.init_search(dataset=dataset, program_runner_name=program_runner_name, strategy_name=strategy_name, max_runs=max_runs, strategy_kwargs=strategy_kwargs,
+                                                             program_runner_kwargs=program_runner_kwargs, dataset_reducer_name=dataset_reducer_name, dataset_reducer_kwargs=dataset_reducer_kwargs)
+        async with RunnerSession(**(session_kwargs or {})) as session:
+            program_runner.session = session
+            try:
+                await strategy.arun_strategy(afunc=lambda config: program_runner.arun(config=config, program=self.program, dataset=dataset, scoring_function=scoring_function))
+            finally:
+                program_runner.session = None  # the session is closed with the search
+        if program_runner.results_store is not None:
+            program_runner.results_store.flush()
+        if checkpoint_file is not None:
+            strategy.save_observations(checkpoint_file)
+        return strategy.choose_best_config()
 
-        # # to just write the configurations, uncomment this block
-        # import json
-        # strategy: AbstractStrategy[ConfigType] = strategy_factory(strategy_name=strategy_name, config_class=self.config_class, max_runs=max_runs, strategy_kwargs=strategy_kwargs)
-        # configs_dicts = [conf.model_dump() for conf in strategy.configs]
-        # with open('configs.json', 'w') as f:
-        #     json.dump(configs_dicts, f, indent=4)
-        # exit()
+    def compare_configurations(self, config_a: ConfigType, config_b: ConfigType) -> PairedComparison:
+        """
+        paired comparison of two configurations evaluated by the last find_best_configuration call.
+        the search must keep the per-sample scores: pass program_runner_kwargs={'keep_sample_scores': True}
+        :param config_a: first configuration
+        :param config_b: second configuration
+        :return: paired statistics of the per-sample score differences, config_a minus config_b
+        :raises AssertionError: if the per-sample scores were not kept, or one of the configurations was not evaluated by the last search
+        """
+        assert self.program_runner is not None, "find_best_configuration must be called before comparing configurations"
+        assert self.program_runner.keep_sample_scores, "pass program_runner_kwargs={'keep_sample_scores': True} to find_best_configuration to compare configurations"
+        sample_scores = self.program_runner.sample_scores
+        for config in (config_a, config_b):
+            assert config.model_dump_json() in sample_scores, f"configuration {config.model_dump()} was not evaluated"
+        return paired_comparison(sample_scores[config_a.model_dump_json()], sample_scores[config_b.model_dump_json()])
 
-        # init program_runner and strategy
-        strategy: AbstractStrategy[ConfigType] = strategy_factory(strategy_name=strategy_name, config_class=self.config_class, max_runs=max_runs, strategy_kwargs=strategy_kwargs)
-        conf_result = []
 
-        # for each config: run and get result, append to conf_result, update the file
-        from tqdm import tqdm
-        import json
-        for conf in tqdm(strategy.configs):
-            result = self.program(conf, dataset[0][0])
-            conf_result.append({'conf': conf.model_dump(), 'result': result})
+    def parameter_importance(self) -> dict[str, float]:
+        """
+        permutation importance of every field of the configuration class, computed on the configurations evaluated by the last search
+        :return: field name to its importance, most important first
+        """
+        from meta_config_wiz.analysis.parameter_importance import parameter_importance  # imported here, so sklearn is imported only when importance is computed
 
-            with open(results_file, 'w') as f:
-                json.dump(conf_result, f, indent=4)
+        assert self.strategy is not None, "find_best_configuration must be called before computing parameter importance"
+        return parameter_importance(self.strategy)
 
-        with open('configs.json', 'w') as f:
-            json.dump(strategy.co, f, indent=4)
+    def reduce_search_space(self, importance_threshold: float = 0.05, top_fraction: float = 0.25) -> Type[ConfigType]:
+        """
+        a smaller configuration class for a follow-up search: unimportant fields are pinned to their best value and numeric ranges are narrowed
+        to the values of the best configurations of the last search. use it as MetaPromptWiz(config_class=reduced_class, program=program)
+        :param importance_threshold: fields with lower importance are pinned
+        :param top_fraction: fraction of the best configurations whose values define the narrowed numeric ranges
+        :return: the reduced configuration class, a subclass of config_class
+        """
+        from meta_config_wiz.analysis.search_space_reduction import reduce_search_space
 
+        assert self.strategy is not None, "find_best_configuration must be called before reducing the search space"
+        return reduce_search_space(self.strategy, importances=self.parameter_importance(), importance_threshold=importance_threshold, top_fraction=top_fraction)
 
+    def write_all_configurations_results(self,
+                                dataset: list[tuple[InputType, OutputType]],
+                                scorer: Callable[[OutputType, OutputType], float],
+                                program_runner_name: Literal['AllMean', 'StreamingMean', 'Latency'] = 'AllMean',
+                                strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy', 'QuasiRandomStrategy', 'EvolutionaryStrategy'] = 'BayesianStrategy',
+                                max_runs: int = 10,
+                                strategy_kwargs: dict[str, Any] | None = None,
+                                results_file: str = 'results.sqlite',
+                                program_runner_kwargs: dict[str, Any] | None = None,
+                                session_kwargs: dict[str, Any] | None = None) -> None:
+        """
+        runs a search and writes down all configurations, their per-sample outputs and scores, and their aggregated scores to a ResultsStore file.
+        open the file with ResultsStore(results_file) to query it, e.g. top_k, group_by_field or sample_records
+        """
+        with ResultsStore(path=results_file) as results_store:
+            self.find_best_configuration(dataset=dataset, scoring_function=scorer, program_runner_name=program_runner_name, strategy_name=strategy_name, max_runs=max_runs,
+                                         strategy_kwargs=strategy_kwargs, program_runner_kwargs={**(program_runner_kwargs or {}), 'results_store': results_store},
+                                         session_kwargs=session_kwargs)
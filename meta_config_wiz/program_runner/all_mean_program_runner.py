@@ -16,9 +16,16 @@ class AllMeanProgramRunner(ProgramRunner):
     run all data sample in dataset, get the score for each, and return the mean of all scores
     """
 
-    def run(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], float]) -> float:
+    async def arun(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], float]) -> float:
         logger.info({"config": config.model_dump()})
-        scores: List[ConfigurationScore] = ProgramRunner.run_program_async(config=config, program=program, dataset=dataset, scoring_function=scoring_function)   # this will be the type of scores, assuming we use a single feature_distribution
+        scores: List[ConfigurationScore] = await self.arun_program(config=config, program=program, dataset=dataset, scoring_function=scoring_function)   # this will be the type of scores, assuming we use a single feature_distribution
+        if len(scores) == 0:  # all samples failed and were skipped
+            logger.warning({"score": self.call_policy.failure_score, "reason": "all samples failed"})
+            if self.results_store is not None:
+                self.results_store.add_config(config=config, score=self.call_policy.failure_score)
+            return self.call_policy.failure_score
         mean_score = sum(scores, 0.0) / len(scores)
         logger.info({"score": mean_score})
+        if self.results_store is not None:
+            self.results_store.add_config(config=config, score=mean_score)
         return mean_score
@@ -0,0 +1,48 @@
+import asyncio
+import random
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CallPolicy(BaseModel):
+    """
+    Controls how a single program call is executed by the program runner
+    * timeout: seconds to wait for a single call (including its hedged duplicate) before giving up on it. None means no timeout.
+        measured from the moment a worker starts the call, so samples waiting for a free worker do not time out
+    * max_retries: number of extra attempts for calls that failed with a transient error
+    * backoff_base, backoff_max: the delay before retry number `attempt` is drawn uniformly from [0, min(backoff_max, backoff_base * 2 ** attempt)] (full jitter)
+    * transient_errors: exception types that are considered transient, only those are retried
+    * hedge: if True, launch a duplicate call when a running call takes longer than the running `hedge_quantile` of the observed latencies
+    * hedge_quantile: latency quantile after which a duplicate call is launched
+    * hedge_min_samples: number of observed latencies needed before hedging starts
+    * on_failure: what to do with a sample whose program call ultimately failed -
+        'raise' re-raises the error, 'skip' drops the sample from the aggregation, 'score' uses failure_score as its score
+    * failure_score: score of failed samples when on_failure is 'score', and of a configuration whose samples were all skipped
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    timeout: float | None = Field(default=None, gt=0)
+    max_retries: int = Field(default=0, ge=0)
+    backoff_base: float = Field(default=0.5, ge=0)
+    backoff_max: float = Field(default=30.0, ge=0)
+    transient_errors: tuple[type[BaseException], ...] = (TimeoutError, asyncio.TimeoutError, ConnectionError)
+    hedge: bool = False
+    hedge_quantile: float = Field(default=0.95, gt=0, lt=1)
+    hedge_min_samples: int = Field(default=20, ge=1)
+    on_failure: Literal['raise', 'skip', 'score'] = 'raise'
+    failure_score: float = 0.0
+
+    def is_transient(self, error: BaseException) -> bool:
+        """
+        :param error: error raised by a program call
+        :return: True if the error should be retried
+        """
+        return isinstance(error, self.transient_errors)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        :param attempt: number of the attempt that just failed, starting from 0
+        :return: seconds to wait before the next attempt
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
@@ -0,0 +1,94 @@
+import statistics
+from typing import Callable, TypeVar, Any, Literal
+
+from pydantic import BaseModel
+
+from meta_config_wiz.logger import logger
+from meta_config_wiz.dataset_reduction.paired_statistics import score_to_float
+from meta_config_wiz.program_runner.program_runner import ProgramRunner
+
+InputType = TypeVar("InputType", bound=Any)
+OutputType = TypeVar("OutputType", bound=Any)
+
+
+class LatencyReport(BaseModel):
+    """
+    Quality and latency of a configuration
+    quality - mean score of the samples
+    program_p50, program_p95, program_p99 - percentiles of the wall time of the program calls, in seconds
+    scoring_p50, scoring_p95, scoring_p99 - percentiles of the wall time of the scoring function calls, in seconds
+    objective - the score returned to the strategy: quality - latency_weight * the program latency percentile
+    samples_number - number of timed samples
+    """
+    quality: float
+    program_p50: float
+    program_p95: float
+    program_p99: float
+    scoring_p50: float
+    scoring_p95: float
+    scoring_p99: float
+    objective: float
+    samples_number: int
+
+
+def latency_percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    """
+    :return: (p50, p95, p99) of the latencies, interpolated between the observations
+    """
+    if len(latencies) < 2:
+        return (latencies[0],) * 3 if latencies else (0.0, 0.0, 0.0)
+    percentiles: list[float] = statistics.quantiles(latencies, n=100, method='inclusive')
+    return percentiles[49], percentiles[94], percentiles[98]
+
+
+class LatencyProgramRunner(ProgramRunner):
+    """
+    run all data samples in the dataset and return their mean score minus a latency penalty, so the strategy optimizes quality and speed together
+    The wall time of every program call and every scoring call is measured with perf_counter. The latency of a program call starts when a worker starts its first attempt,
+    so the time a sample waits for a free worker is not counted, and ends when an output is available, so failed attempts, backoff and hedging delays are counted.
+    The quality, the p50/p95/p99 latencies and the objective of every configuration are kept in latency_reports
+    """
+
+    def __init__(self, latency_weight: float = 0.0, latency_percentile: Literal['p50', 'p95', 'p99'] = 'p95', **kwargs):
+        """
+        :param latency_weight: λ of the objective quality - λ * latency, in score units per second. 0 only reports the latencies
+        :param latency_percentile: which percentile of the program latency is penalized
+        :param kwargs: passed to ProgramRunner, e.g. call_policy or results_store
+        """
+        super().__init__(**kwargs)
+        self.latency_weight: float = latency_weight
+        self.latency_percentile: Literal['p50', 'p95', 'p99'] = latency_percentile
+        self.sample_timings: dict[str, list[tuple[float, float]]] = {}  # configuration json to the (program latency, scoring latency) of every scored sample
+        self.latency_reports: dict[str, LatencyReport] = {}  # configuration json to its quality and latency
+
+    def record_timing(self, config: BaseModel, input_id: int, program_latency: float, scoring_latency: float) -> None:
+        self.sample_timings.setdefault(config.model_dump_json(), []).append((program_latency, scoring_latency))
+
+    async def arun(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], float]) -> float:
+        logger.info({"config": config.model_dump()})
+        config_key: str = config.model_dump_json()
+        self.sample_timings[config_key] = []
+        try:
+            scores: list[Any] = await self.arun_program(config=config, program=program, dataset=dataset, scoring_function=scoring_function)
+        finally:  # the timings are dropped also if the evaluation failed
+            timings: list[tuple[float, float]] = self.sample_timings.pop(config_key)
+        if len(scores) == 0:  # all samples failed and were skipped
+            logger.warning({"score": self.call_policy.failure_score, "reason": "all samples failed"})
+            if self.results_store is not None:
+                self.results_store.add_config(config=config, score=self.call_policy.failure_score)
+            return self.call_policy.failure_score
+
+        program_p50, program_p95, program_p99 = latency_percentiles([program_latency for program_latency, _ in timings])
+        scoring_p50, scoring_p95, scoring_p99 = latency_percentiles([scoring_latency for _, scoring_latency in timings])
+        quality: float = sum(score_to_float(score) for score in scores) / len(scores)
+        penalized_latency: float = {'p50': program_p50, 'p95': program_p95, 'p99': program_p99}[self.latency_percentile]
+        report: LatencyReport = LatencyReport(
+            quality=quality, program_p50=program_p50, program_p95=program_p95, program_p99=program_p99,
+            scoring_p50=scoring_p50, scoring_p95=scoring_p95, scoring_p99=scoring_p99,
+            objective=quality - self.latency_weight * penalized_latency, samples_number=len(timings),
+        )
+        self.latency_reports[config_key] = report
+        logger.info({"score": report.objective, "latency": report.model_dump()})
+        if self.results_store is not None:
+            self.results_store.add_config(config=config, score=report.objective)
+        return report.objective
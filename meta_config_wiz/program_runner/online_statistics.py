@@ -0,0 +1,116 @@
+import math
+
+
+class P2Quantile:
+    """
+    Streaming estimate of a quantile with the P² algorithm: five markers are adjusted with every observation,
+    so the memory is constant and no observation is kept.
+    Exact for the first five observations.
+    Based on: Jain and Chlamtac, The P² Algorithm for Dynamic Calculation of Quantiles and Histograms Without Storing Observations, 1985
+    """
+
+    def __init__(self, quantile: float):
+        """
+        :param quantile: the quantile to estimate, between 0 and 1
+        """
+        assert 0 < quantile < 1, "quantile must be between 0 and 1"
+        self.quantile: float = quantile
+        self.heights: list[float] = []  # marker heights, the first five observations until the markers are initialized
+        self.positions: list[int] = [1, 2, 3, 4, 5]  # actual marker positions
+        self.desired_positions: list[float] = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments: list[float] = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value: float) -> None:
+        if len(self.heights) < 5:
+            self.heights.append(value)
+            self.heights.sort()
+            return
+
+        # find the cell of the value, and extend the extreme markers if needed
+        if value < self.heights[0]:
+            self.heights[0] = value
+            cell = 0
+        elif value >= self.heights[4]:
+            self.heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if self.heights[i] <= value < self.heights[i + 1])
+        for i in range(cell + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired_positions[i] += self.increments[i]
+
+        # move the middle markers toward their desired positions, with a parabolic prediction of their height or a linear one if it is not monotone
+        for i in range(1, 4):
+            offset: float = self.desired_positions[i] - self.positions[i]
+            if (offset >= 1 and self.positions[i + 1] - self.positions[i] > 1) or (offset <= -1 and self.positions[i - 1] - self.positions[i] < -1):
+                step: int = 1 if offset > 0 else -1
+                height: float = self.parabolic(i, step)
+                if not self.heights[i - 1] < height < self.heights[i + 1]:
+                    height = self.heights[i] + step * (self.heights[i + step] - self.heights[i]) / (self.positions[i + step] - self.positions[i])
+                self.heights[i] = height
+                self.positions[i] += step
+
+    def parabolic(self, i: int, step: int) -> float:
+        """ piecewise-parabolic prediction of the height of marker i after moving it by step """
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        """
+        :return: the quantile estimate, nan before the first observation
+        """
+        if len(self.heights) == 5:
+            return self.heights[2]
+        if not self.heights:
+            return math.nan
+        return self.heights[min(int(self.quantile * len(self.heights)), len(self.heights) - 1)]
+
+
+class OnlineStatistics:
+    """
+    Streaming count, mean, variance (Welford's algorithm) and quantiles (P²) of a sequence of values, in constant memory
+    """
+
+    def __init__(self, quantiles: tuple[float, ...] = (0.5,)):
+        """
+        :param quantiles: quantiles to estimate
+        """
+        self.count: int = 0
+        self.mean: float = 0.0
+        self.sum_squared_deviations: float = 0.0
+        self.quantile_estimators: dict[float, P2Quantile] = {quantile: P2Quantile(quantile) for quantile in quantiles}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta: float = value - self.mean
+        self.mean += delta / self.count
+        self.sum_squared_deviations += delta * (value - self.mean)
+        for estimator in self.quantile_estimators.values():
+            estimator.add(value)
+
+    @property
+    def variance(self) -> float:
+        """ sample variance, 0 for less than two values """
+        return self.sum_squared_deviations / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """ standard error of the mean, inf for less than two values """
+        return math.sqrt(self.variance / self.count) if self.count > 1 else math.inf
+
+    def quantile(self, quantile: float) -> float:
+        """
+        :param quantile: one of the quantiles given to the constructor
+        :return: the estimate of the quantile
+        """
+        return self.quantile_estimators[quantile].value()
+
+    def summary(self) -> dict[str, float]:
+        """
+        :return: count, mean, variance and the quantile estimates, e.g. {'count': 100, 'mean': 0.8, 'variance': 0.02, 'p50': 0.9}
+        """
+        return {"count": self.count, "mean": self.mean, "variance": self.variance,
+                **{f"p{quantile * 100:g}": estimator.value() for quantile, estimator in self.quantile_estimators.items()}}
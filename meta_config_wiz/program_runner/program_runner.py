@@ -1,4 +1,8 @@
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from time import perf_counter
+import inspect
 from typing import Callable, TypeVar, Generic, Any
 
 from pydantic import BaseModel
@@ -8,33 +12,246 @@ InputType = TypeVar("InputType", bound=Any)
 OutputType = TypeVar("OutputType", bound=Any)
 
 from meta_config_wiz.models.scores import EvaluationScore
+from meta_config_wiz.program_runner.call_policy import CallPolicy
+from meta_config_wiz.results_store.results_store import ResultsStore
+from meta_config_wiz.program_runner.runner_session import RunnerSession, WorkerPool
+from meta_config_wiz.logger import logger
+
+
+def is_coroutine_function(function: Callable) -> bool:
+    """
+    :return: True if calling the function returns a coroutine: an async function, a partial of one, or an object with an async __call__
+    """
+    return inspect.iscoroutinefunction(function) or inspect.iscoroutinefunction(getattr(function, "__call__", None))
 
 
 class ProgramRunner(ABC, Generic[InputType, OutputType]):
     """
     Given a configuration, a program, a dataset, and a scoring function, return the list of scores for the program for each data sample in the dataset
     :param config: Configuration
+    :param call_policy: timeouts, retries, hedging and failure handling of every program call. default runs every call once, without a timeout
+    :param results_store: if given, every evaluated sample and configuration is recorded in it
+    :param session: if given, configurations are evaluated on the event loop of the session and program calls run in its executor.
+        otherwise every configuration gets a new event loop and a new executor
+    :param keep_sample_scores: keep the score of every sample of every configuration in sample_scores, needed by MetaPromptWiz.compare_configurations.
+        off by default, so the memory does not grow with the number of configurations times the dataset size
+    dataset_indices: index of every sample of the evaluated dataset in the original dataset, set by MetaPromptWiz when the dataset is reduced,
+        so the results store records the original index of every sample
     """
 
-    @staticmethod
-    def run_program_async(config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], EvaluationScore]) -> list[EvaluationScore]:
-        """ return list of scores for each data sample in the dataset, computed asynchronously """
+    def __init__(self, call_policy: CallPolicy | None = None, max_tracked_latencies: int = 1000, results_store: ResultsStore | None = None, session: RunnerSession | None = None,
+                 keep_sample_scores: bool = False):
+        self.call_policy: CallPolicy = call_policy or CallPolicy()
+        self.results_store: ResultsStore | None = results_store
+        self.session: RunnerSession | None = session
+        self.latencies: deque[float] = deque(maxlen=max_tracked_latencies)  # latencies of the latest successful program calls, used for hedging
+        self.keep_sample_scores: bool = keep_sample_scores
+        self.sample_scores: dict[str, list[EvaluationScore | None]] = {}  # configuration json to the score of each sample, None for skipped samples. only if keep_sample_scores
+        self.dataset_indices: list[int] | None = None  # index of every evaluated sample in the original dataset, None if the dataset was not reduced
+
+    def hedge_threshold(self) -> float | None:
+        """
+        :return: the running latency quantile after which a duplicate call is launched, None if hedging is off or there are not enough observations yet
+        """
+        if not self.call_policy.hedge or len(self.latencies) < self.call_policy.hedge_min_samples:
+            return None
+        sorted_latencies = sorted(self.latencies)
+        return sorted_latencies[int(self.call_policy.hedge_quantile * (len(sorted_latencies) - 1))]
+
+    async def call_program_hedged(self, executor: Executor, program: Callable, config: BaseModel, input: InputType, timeout: float | None = None,
+                                  start_times: list[float] | None = None) -> tuple[OutputType, float, float]:
+        """
+        call the program in the executor. if hedging is on and the call is slower than the running latency quantile, launch a duplicate call and return the first one to succeed
+        the timeout and the hedging threshold are measured from the moment a worker starts the call, so time spent waiting for a free worker is not counted
+        an async program is awaited on the running event loop instead, with the same timeout and hedging, and is cancelled when it times out
+        a call that times out while running in the worker pool of a session is left to finish in the background, and its worker is replaced
+        :param timeout: seconds to wait for the call (including its hedged duplicate) after it started, None to wait until it returns
+        :param start_times: if given, the perf_counter time at which the first call started is appended to it, also if the call fails
+        :return: (program output, wall time of the call that succeeded in seconds, perf_counter time at which the call that succeeded returned).
+            the end time is taken where the program ran, so it does not include the wait for the event loop to pick up the output
+        :raises TimeoutError: if no call succeeded within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        executor_calls: list[Future] = []
+        call_start_times: list[float] = []  # perf_counter time at which every call started, the first call first
+
+        def submit_program_call() -> tuple[asyncio.Future, asyncio.Event]:
+            started = asyncio.Event()
+
+            if is_coroutine_function(program):
+                async def timed_coroutine_call() -> tuple[OutputType, float, float]:
+                    start = perf_counter()
+                    call_start_times.append(start)
+                    output = await program(config, input)
+                    end = perf_counter()
+                    return output, end - start, end
+
+                started.set()  # a coroutine does not wait for a worker
+                return asyncio.ensure_future(timed_coroutine_call()), started
+
+            def timed_program_call() -> tuple[OutputType, float, float]:
+                # latency is measured inside the worker thread so it does not include waiting for a free worker, nor for the event loop
+                start = perf_counter()
+                call_start_times.append(start)
+                loop.call_soon_threadsafe(started.set)
+                output = program(config, input)
+                end = perf_counter()
+                return output, end - start, end
 
-        async def run_program_async(input: InputType, expected_result: OutputType):
-            result_pred: OutputType = await asyncio.to_thread(program, config, input)
+            executor_call: Future = executor.submit(timed_program_call)
+            executor_calls.append(executor_call)
+            return asyncio.wrap_future(executor_call), started
+
+        first_call, first_call_started = submit_program_call()
+        calls = {first_call}
+        try:
+            # the clocks start when a worker picks up the call
+            started_waiter = asyncio.ensure_future(first_call_started.wait())
+            await asyncio.wait({first_call, started_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            started_waiter.cancel()
+            if start_times is not None and call_start_times:
+                start_times.append(call_start_times[0])
+            deadline = loop.time() + timeout if timeout is not None else None
+
+            threshold = self.hedge_threshold()
+            if threshold is not None and not first_call.done():
+                done, _ = await asyncio.wait(calls, timeout=threshold if deadline is None else min(threshold, deadline - loop.time()))
+                if not done and (deadline is None or loop.time() < deadline):
+                    calls.add(submit_program_call()[0])
+            # return the first call that succeeded, raise the error of the last one if all failed
+            pending = calls
+            while True:
+                done, pending = await asyncio.wait(pending, timeout=None if deadline is None else max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if isinstance(executor, WorkerPool):  # the running calls may hang forever, so they should not hold workers
+                        for executor_call in executor_calls:
+                            executor.replace_worker(executor_call)
+                    raise TimeoutError(f"program call timed out after {timeout} seconds")
+                succeeded = [call for call in done if not call.cancelled() and call.exception() is None]
+                if succeeded or not pending:
+                    break
+            if not succeeded:
+                raise done.pop().exception()
+            output, latency, end = succeeded[0].result()
+            self.latencies.append(latency)
+            return output, latency, end
+        finally:
+            for call in calls:
+                call.cancel()
+
+    async def call_program(self, executor: Executor, program: Callable, config: BaseModel, input: InputType) -> tuple[OutputType, float]:
+        """
+        call the program, applying the timeout and retrying transient errors with jittered exponential backoff
+        :return: (program output, latency in seconds). the latency is measured from the moment a worker started the first attempt until the output is available,
+            so it includes failed attempts, backoff delays and the wait for the hedging threshold, but not the wait of the first attempt for a free worker,
+            nor the wait for the event loop after the program returned (e.g. while it runs the scoring functions of other samples)
+        :raises: the error of the last attempt if all attempts failed
+        """
+        policy = self.call_policy
+        start_times: list[float] = []  # start time of every attempt
+        for attempt in range(policy.max_retries + 1):
             try:
-                score: EvaluationScore = scoring_function(result_pred, expected_result)
-            except TypeError:
-                score: EvaluationScore = scoring_function(result_pred)
-            return score
+                output, _, end = await self.call_program_hedged(executor, program, config, input, timeout=policy.timeout, start_times=start_times)
+                return output, end - start_times[0]
+            except Exception as e:
+                error: Exception = e
+            if attempt == policy.max_retries or not policy.is_transient(error):
+                raise error
+            logger.warning({"retry": attempt + 1, "error": repr(error)})
+            await asyncio.sleep(policy.backoff_delay(attempt))
+
+    def open_executor(self) -> Executor:
+        """
+        :return: the executor of the session, or a new executor for a single configuration if there is no session
+        """
+        return self.session.executor if self.session is not None else ThreadPoolExecutor()
+
+    def close_executor(self, executor: Executor) -> None:
+        """
+        shut down an executor opened by open_executor, unless it belongs to the session.
+        it is not waited for, so calls that timed out and are still hanging do not block the run
+        """
+        if self.session is None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        async def run_programs_async():
-            tasks = [run_program_async(input, expected_result) for input, expected_result in dataset]
-            return await asyncio.gather(*tasks)
+    def dataset_index(self, input_id: int) -> int:
+        """
+        :param input_id: index of the sample in the evaluated dataset
+        :return: index of the sample in the original dataset
+        """
+        return self.dataset_indices[input_id] if self.dataset_indices is not None else input_id
 
-        scores = asyncio.run(run_programs_async())
-        return scores
+    def record_timing(self, config: BaseModel, input_id: int, program_latency: float, scoring_latency: float) -> None:
+        """
+        called for every successfully scored sample. does nothing by default, runners that use the timings override it
+        :param program_latency: latency of the program call in seconds, from the moment a worker started its first attempt until its output was available,
+            including retries and hedged duplicates, but not the wait for a free worker nor for the event loop
+        :param scoring_latency: wall time of the scoring function call in seconds
+        """
+        pass
+
+    async def arun_sample(self, executor: Executor, config: BaseModel, program: Callable, input_id: int, input: InputType, expected_result: OutputType,
+                          scoring_function: Callable[[OutputType, OutputType], EvaluationScore]) -> tuple[EvaluationScore | None, OutputType | None]:
+        """
+        run the program on a single data sample and score its output
+        a sample whose program call failed is scored according to the call policy: None if it says to skip it
+        :return: (score, program output). the output is None if the program call failed
+        """
+        try:
+            result_pred, latency = await self.call_program(executor, program, config, input)
+        except Exception as e:
+            if self.call_policy.on_failure == 'raise':
+                raise
+            logger.warning({"failed_sample": repr(input), "error": repr(e)})
+            score = None if self.call_policy.on_failure == 'skip' else self.call_policy.failure_score
+            if self.results_store is not None:
+                self.results_store.add_sample(config=config, input_id=self.dataset_index(input_id), score=score, error=repr(e))
+            return score, None
+        scoring_start = perf_counter()
+        try:
+            score: EvaluationScore = scoring_function(result_pred, expected_result)
+        except TypeError:
+            score: EvaluationScore = scoring_function(result_pred)
+        if inspect.isawaitable(score):  # async scoring function
+            score = await score
+        self.record_timing(config=config, input_id=input_id, program_latency=latency, scoring_latency=perf_counter() - scoring_start)
+        if self.results_store is not None:
+            self.results_store.add_sample(config=config, input_id=self.dataset_index(input_id), output=result_pred, score=score, latency=latency)
+        return score, result_pred
+
+    async def arun_program(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], EvaluationScore]) -> list[EvaluationScore]:
+        """
+        return list of scores for each data sample in the dataset, computed concurrently on the running event loop
+        samples whose program call failed are scored according to the call policy, and are left out of the list if it says to skip them
+        """
+        executor = self.open_executor()
+        try:
+            tasks = [self.arun_sample(executor, config, program, input_id, input, expected_result, scoring_function) for input_id, (input, expected_result) in enumerate(dataset)]
+            scores = [score for score, _ in await asyncio.gather(*tasks)]
+        finally:
+            self.close_executor(executor)
+        if self.keep_sample_scores:
+            self.sample_scores[config.model_dump_json()] = scores
+        return [score for score in scores if score is not None]
+
+    def run_program_async(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], EvaluationScore]) -> list[EvaluationScore]:
+        """
+        return list of scores for each data sample in the dataset, computed asynchronously on the event loop of the session, or in a new event loop
+        can not be called from a running event loop, use arun_program there
+        """
+        coroutine = self.arun_program(config=config, program=program, dataset=dataset, scoring_function=scoring_function)
+        return self.session.run(coroutine) if self.session is not None else asyncio.run(coroutine)
 
     @abstractmethod
+    async def arun(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], float]) -> float:
+        """
+        the score of the configuration, computed on the running event loop
+        """
+        pass
+
     def run(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], float]) -> float:
-        pass
\ No newline at end of file
+        """
+        the score of the configuration, computed on the event loop of the session, or in a new event loop. can not be called from a running event loop, use arun there
+        """
+        coroutine = self.arun(config=config, program=program, dataset=dataset, scoring_function=scoring_function)
+        return self.session.run(coroutine) if self.session is not None else asyncio.run(coroutine)
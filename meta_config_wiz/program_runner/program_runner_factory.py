@@ -1,17 +1,25 @@
-from typing import Literal
+from typing import Literal, Any
 
-from meta_config_wiz.program_runner.all_mean_program_runner import AllMeanProgramRunner
 from meta_config_wiz.program_runner.program_runner import ProgramRunner
 
 
-def program_runner_factory(program_runner_name: Literal['AllMean']) -> ProgramRunner:
+def program_runner_factory(program_runner_name: Literal['AllMean', 'StreamingMean', 'Latency'], program_runner_kwargs: dict[str, Any] | None = None) -> ProgramRunner:
     """
     Factory method for creating program runner instances
     :param program_runner_name: name of the program runner to create
+    :param program_runner_kwargs: kwargs to pass to the program runner, e.g. call_policy
     :return: instance of the program runner
     """
+    # program runners are imported only when selected
     match program_runner_name:
         case 'AllMean':
-            return AllMeanProgramRunner()
+            from meta_config_wiz.program_runner.all_mean_program_runner import AllMeanProgramRunner
+            return AllMeanProgramRunner(**(program_runner_kwargs or {}))
+        case 'StreamingMean':
+            from meta_config_wiz.program_runner.streaming_mean_program_runner import StreamingMeanProgramRunner
+            return StreamingMeanProgramRunner(**(program_runner_kwargs or {}))
+        case 'Latency':
+            from meta_config_wiz.program_runner.latency_program_runner import LatencyProgramRunner
+            return LatencyProgramRunner(**(program_runner_kwargs or {}))
         case _:
             raise ValueError(f"Unknown program runner name: {program_runner_name}")
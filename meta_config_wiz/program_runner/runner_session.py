@@ -0,0 +1,253 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from time import monotonic
+from typing import Any, Callable, Coroutine
+
+from meta_config_wiz.logger import logger
+
+# resources of the current worker thread, set by the worker_initializer of the session that owns the thread
+worker_local: threading.local = threading.local()
+
+
+def worker_resources() -> dict[str, Any]:
+    """
+    The resources created by the worker_initializer of the running session for the current worker thread, e.g. an HTTP client or a DB connection.
+    Call it inside the program: `client = worker_resources()["client"]`
+    :return: resource name to resource. empty outside a session worker thread, or if the session has no worker_initializer
+    """
+    return getattr(worker_local, "resources", {})
+
+
+class WorkerPool(Executor):
+    """
+    A fixed number of worker threads that run the submitted calls, like ThreadPoolExecutor, except that a worker whose call timed out can be replaced:
+    replace_worker starts a new worker in its place and retires the old one, which exits as soon as its hanging call returns.
+    So calls that hang do not take the workers of later configurations. At most max_retired_workers retired workers can be alive at the same time,
+    so calls that never return do not create threads without a limit.
+    Workers are daemon threads, so a call that never returns does not block the exit of the interpreter.
+    """
+
+    def __init__(self, max_workers: int, initializer: Callable[[], None] | None = None, thread_name_prefix: str = "meta_config_wiz_worker",
+                 max_retired_workers: int | None = None):
+        """
+        :param max_workers: number of active worker threads
+        :param initializer: called once in every worker thread, including the replacing workers, before it runs calls
+        :param thread_name_prefix: prefix of the names of the worker threads
+        :param max_retired_workers: max number of retired workers that still run a hanging call, workers are not replaced beyond it. default is 10 * max_workers
+        """
+        assert max_workers > 0, "max_workers must be greater than 0"
+        self.max_workers: int = max_workers
+        self.max_retired_workers: int = max_retired_workers if max_retired_workers is not None else 10 * max_workers
+        self.initializer: Callable[[], None] | None = initializer
+        self.thread_name_prefix: str = thread_name_prefix
+        self.calls: queue.SimpleQueue = queue.SimpleQueue()  # (future, function, args, kwargs) of the submitted calls, None asks a worker to exit
+        self.lock: threading.Lock = threading.Lock()
+        self.workers: set[threading.Thread] = set()  # active workers
+        self.retired_workers: set[threading.Thread] = set()  # replaced workers that still run their hanging call
+        self.running_calls: dict[Future, threading.Thread] = {}  # future of every running call to the worker that runs it
+        self.started_workers_number: int = 0
+        self.is_shutdown: bool = False
+        with self.lock:
+            for _ in range(max_workers):
+                self.start_worker()
+
+    def start_worker(self) -> None:
+        """ starts a new active worker, must be called with the lock held """
+        self.started_workers_number += 1
+        worker = threading.Thread(target=self.work, name=f"{self.thread_name_prefix}_{self.started_workers_number}", daemon=True)
+        self.workers.add(worker)
+        worker.start()
+
+    def work(self) -> None:
+        """ the loop of a worker thread: runs the submitted calls until it is asked to exit, or until it is retired """
+        worker: threading.Thread = threading.current_thread()
+        initializer_error: BaseException | None = None
+        if self.initializer is not None:
+            try:
+                self.initializer()
+            except BaseException as e:  # the calls of this worker fail with the error, so it is reported through the call policy instead of hanging them
+                logger.warning({"worker_initializer_error": repr(e)})
+                initializer_error = e
+        while (call := self.calls.get()) is not None:
+            future, function, args, kwargs = call
+            if not future.set_running_or_notify_cancel():  # cancelled while it was queued
+                continue
+            with self.lock:
+                self.running_calls[future] = worker
+            try:
+                if initializer_error is not None:
+                    raise initializer_error
+                result: Any = function(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            with self.lock:
+                del self.running_calls[future]
+                if worker in self.retired_workers:  # replaced while its call was hanging, the replacing worker takes the next calls
+                    self.retired_workers.discard(worker)
+                    return
+
+    def submit(self, function: Callable, /, *args, **kwargs) -> Future:
+        with self.lock:
+            if self.is_shutdown:
+                raise RuntimeError("cannot submit a call to a worker pool that was shut down")
+        future: Future = Future()
+        self.calls.put((future, function, args, kwargs))
+        return future
+
+    def replace_worker(self, future: Future) -> bool:
+        """
+        retires the worker that runs the call of the future, and starts a new worker in its place. does nothing if the call is not running anymore
+        :param future: future of a call that was given up on, e.g. because it timed out
+        :return: True if the worker was replaced
+        """
+        with self.lock:
+            worker: threading.Thread | None = self.running_calls.get(future)
+            if worker is None or worker not in self.workers or self.is_shutdown:
+                return False
+            if len(self.retired_workers) >= self.max_retired_workers:
+                logger.warning({"hanging_calls": len(self.retired_workers), "reason": "too many hanging calls, the worker is not replaced"})
+                return False
+            self.workers.discard(worker)
+            self.retired_workers.add(worker)
+            self.start_worker()
+            return True
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """
+        asks every active worker to exit after its current call. retired workers exit when their hanging call returns
+        :param wait: wait for the active workers to exit
+        :param cancel_futures: cancel the calls that did not start yet
+        """
+        with self.lock:
+            self.is_shutdown = True
+            workers: list[threading.Thread] = list(self.workers)
+        if cancel_futures:
+            while True:
+                try:
+                    call = self.calls.get_nowait()
+                except queue.Empty:
+                    break
+                if call is not None:
+                    call[0].cancel()
+        for _ in workers:
+            self.calls.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def all_workers(self) -> list[threading.Thread]:
+        """
+        :return: the active and the retired workers
+        """
+        with self.lock:
+            return list(self.workers | self.retired_workers)
+
+
+class RunnerSession:
+    """
+    Long-lived execution resources shared by all the configurations of a search:
+    * one event loop, running in a background thread, that runs the evaluation of every configuration
+    * one WorkerPool of max_workers threads, that runs every program call. A worker whose call timed out is replaced, so hanging calls do not starve later configurations
+    * optional per-worker resources: worker_initializer runs once in every worker thread and its resources are available to the program
+      through worker_resources(). worker_teardown is called with the resources of every worker when the session is closed,
+      only for workers that exited, so resources are never torn down while a hanging call may still use them
+    Without a session, every configuration gets a new event loop and a new executor, and programs have to create their clients per call.
+    MetaPromptWiz.find_best_configuration creates a session for the duration of the search. Use it as a context manager, or call close().
+    On a running event loop use it as an async context manager, or await aclose()
+    """
+
+    def __init__(self, max_workers: int = 32, worker_initializer: Callable[[], dict[str, Any]] | None = None,
+                 worker_teardown: Callable[[dict[str, Any]], None] | None = None, teardown_timeout: float = 10.0, max_hanging_workers: int | None = None):
+        """
+        :param max_workers: number of worker threads, the max number of concurrent program calls
+        :param worker_initializer: called once in every worker thread, returns its resources by name, e.g. lambda: {"client": httpx.Client()}
+        :param worker_teardown: called with the resources of every worker when the session is closed, e.g. lambda resources: resources["client"].close().
+            it runs in the thread that closes the session, so thread-bound resources must allow it (e.g. sqlite3.connect(..., check_same_thread=False))
+        :param teardown_timeout: seconds close() waits for the workers to finish their calls and exit. the resources of workers that are still running a call
+            are not torn down, and a warning is logged
+        :param max_hanging_workers: max number of replaced workers whose timed out call is still running, beyond it timed out workers are not replaced.
+            default is 10 * max_workers
+        """
+        self.worker_initializer: Callable[[], dict[str, Any]] | None = worker_initializer
+        self.worker_teardown: Callable[[dict[str, Any]], None] | None = worker_teardown
+        self.teardown_timeout: float = teardown_timeout
+        self.workers_resources: dict[threading.Thread, dict[str, Any]] = {}  # resources of every initialized worker, for the teardown
+        self.lock: threading.Lock = threading.Lock()
+        self.executor: WorkerPool = WorkerPool(max_workers=max_workers, initializer=self.initialize_worker, max_retired_workers=max_hanging_workers)
+        self.loop: asyncio.AbstractEventLoop | None = None  # started by the first call of run
+        self.loop_thread: threading.Thread | None = None
+
+    def initialize_worker(self) -> None:
+        """ runs once in every worker thread of the executor """
+        resources: dict[str, Any] = self.worker_initializer() if self.worker_initializer is not None else {}
+        worker_local.resources = resources
+        with self.lock:
+            self.workers_resources[threading.current_thread()] = resources
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """
+        run a coroutine on the event loop of the session and wait for its result. can be called from several threads at the same time
+        :param coroutine: the coroutine to run
+        :return: the result of the coroutine
+        """
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.loop_thread = threading.Thread(target=self.loop.run_forever, name="meta_config_wiz_loop", daemon=True)
+                self.loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self) -> None:
+        """
+        stop the event loop, shut down the executor, and tear down the resources of the workers that exited within teardown_timeout.
+        the resources of workers that still run a hanging program call are left to them, since the call may still use them.
+        without a worker_teardown the workers are not waited for, they exit after their current call.
+        it blocks up to teardown_timeout, so from a running event loop use `async with` or aclose instead
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop.close()
+            self.loop = None
+        workers: list[threading.Thread] = self.executor.all_workers()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            workers_resources: dict[threading.Thread, dict[str, Any]] = self.workers_resources
+            self.workers_resources = {}
+        if self.worker_teardown is None:  # nothing to tear down, so there is no reason to wait for the workers
+            return
+        deadline: float = monotonic() + self.teardown_timeout
+        for worker in workers:
+            worker.join(timeout=max(deadline - monotonic(), 0))
+        hanging_workers: list[str] = [worker.name for worker in workers_resources if worker.is_alive()]
+        if hanging_workers:
+            logger.warning({"hanging_workers": hanging_workers, "reason": "their program calls did not return, their resources are not torn down"})
+        for worker, resources in workers_resources.items():
+            if worker.is_alive():
+                continue
+            try:
+                self.worker_teardown(resources)
+            except Exception as e:  # a failing teardown should not hide the result of the search, or stop the teardown of the other workers
+                logger.warning({"worker_teardown_error": repr(e)})
+
+    async def aclose(self) -> None:
+        """
+        close the session in a separate thread, so waiting for the workers does not block the running event loop
+        """
+        await asyncio.to_thread(self.close)
+
+    def __enter__(self) -> 'RunnerSession':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    async def __aenter__(self) -> 'RunnerSession':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
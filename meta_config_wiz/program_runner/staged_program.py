@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Hashable, Type
+
+from pydantic import BaseModel, ConfigDict, model_validator
+
+
+class Stage(BaseModel):
+    """
+    A single stage of a multi-stage program
+    * name: name of the stage, later stages get its output under this name
+    * function: a callable from (configuration, input, outputs of the previous stages by name) to the stage output
+    * depends_on: the configuration fields the stage reads. the stage output is reused for all configurations that agree on them
+    * config_class: the configuration class, if given depends_on is checked against its fields when the stage is built,
+        so a misspelled field fails early instead of on the first call, or is silently ignored by the cache key
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    function: Callable[[BaseModel, Any, dict[str, Any]], Any]
+    depends_on: list[str]
+    config_class: Type[BaseModel] | None = None
+
+    @model_validator(mode="after")
+    def depends_on_validator(self) -> "Stage":
+        """
+        Validates that the stage depends only on fields of the configuration class
+        """
+        if self.config_class is not None:
+            unknown_fields: list[str] = [field for field in self.depends_on if field not in self.config_class.model_fields]
+            if unknown_fields:
+                raise ValueError(f"stage {self.name} depends on {unknown_fields}, which are not fields of {self.config_class.__name__}")
+        return self
+
+
+class StagedProgram:
+    """
+    A program declared as a sequence of stages, that can be passed to MetaPromptWiz as the program
+    The output of every stage is cached by (stage, values of the fields it and the previous stages depend on, input),
+    so across the configurations of a sweep only the stages whose fields changed are computed again.
+    For example, in Text2SQL the examples retrieved for a question depend only on example_selector and examples_number,
+    so they are retrieved once for all the llm and error_correction values.
+    Concurrent calls that need the same stage output wait for a single computation. Errors are not cached.
+    """
+
+    def __init__(self, stages: list[Stage], input_key: Callable[[Any], Hashable] = repr, max_cache_size: int | None = None, wait_timeout: float | None = None):
+        """
+        :param stages: the stages, in the order they run. the output of the last stage is the program output
+        :param input_key: function that maps a program input to a hashable cache key. default is repr, which supports unhashable inputs
+        :param max_cache_size: max number of cached stage outputs, the least recently used are evicted. None for unlimited
+        :param wait_timeout: seconds a call waits for the computation of a stage output by a concurrent call, before it raises TimeoutError.
+            None waits until the computation ends, so a hanging computation also hangs the calls that wait for it
+        """
+        assert len(stages) > 0, "a staged program needs at least one stage"
+        assert len({stage.name for stage in stages}) == len(stages), "stage names must be unique"
+        self.stages: list[Stage] = stages
+        self.input_key: Callable[[Any], Hashable] = input_key
+        self.max_cache_size: int | None = max_cache_size
+        self.wait_timeout: float | None = wait_timeout
+        self.cache: OrderedDict[tuple, Any] = OrderedDict()  # cache key to stage output
+        self.in_flight: dict[tuple, Future] = {}  # cache key to the computation that is running for it
+        self.lock: threading.Lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def run_stage(self, key: tuple, stage: Stage, config: BaseModel, input: Any, outputs: dict[str, Any]) -> Any:
+        """
+        :return: the cached output of the stage, or the output of a running computation of it, or a new computation of it
+        """
+        with self.lock:
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            computation: Future | None = self.in_flight.get(key)
+            if computation is None:
+                self.misses += 1
+                self.in_flight[key] = Future()
+            else:
+                self.hits += 1
+        if computation is not None:
+            try:
+                return computation.result(timeout=self.wait_timeout)
+            except FutureTimeoutError:  # not the builtin TimeoutError before python 3.11
+                raise TimeoutError(f"stage {stage.name} was not computed by a concurrent call within {self.wait_timeout} seconds")
+
+        try:
+            output: Any = stage.function(config, input, outputs)
+        except BaseException as e:
+            with self.lock:
+                self.in_flight.pop(key).set_exception(e)
+            raise
+        with self.lock:
+            self.cache[key] = output
+            if self.max_cache_size is not None and len(self.cache) > self.max_cache_size:
+                self.cache.popitem(last=False)
+            self.in_flight.pop(key).set_result(output)
+        return output
+
+    def __call__(self, config: BaseModel, input: Any) -> Any:
+        input_key: Hashable = self.input_key(input)
+        outputs: dict[str, Any] = {}
+        relevant_fields: set[str] = set()
+        for stage in self.stages:
+            # a stage output also depends on the fields of the stages before it, through their outputs
+            relevant_fields.update(stage.depends_on)
+            key: tuple = (stage.name, tuple((field, getattr(config, field)) for field in sorted(relevant_fields)), input_key)
+            outputs[stage.name] = self.run_stage(key, stage, config, input, outputs)
+        return outputs[self.stages[-1].name]
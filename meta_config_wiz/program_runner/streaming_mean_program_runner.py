@@ -0,0 +1,124 @@
+import asyncio
+from typing import Callable, TypeVar, Any
+
+from pydantic import BaseModel
+
+from meta_config_wiz.logger import logger
+from meta_config_wiz.dataset_reduction.paired_statistics import score_to_float
+from meta_config_wiz.program_runner.online_statistics import OnlineStatistics
+from meta_config_wiz.program_runner.program_runner import ProgramRunner
+
+InputType = TypeVar("InputType", bound=Any)
+OutputType = TypeVar("OutputType", bound=Any)
+
+
+class StreamingMeanProgramRunner(ProgramRunner):
+    """
+    run all data samples in the dataset and return the mean of their scores, like AllMeanProgramRunner,
+    but consume the scores in completion order and keep only online statistics of them: count, mean, variance and quantiles.
+    At most max_in_flight samples run at a time, and outputs are dropped after scoring unless keep_outputs is set,
+    so the memory does not grow with the dataset size.
+    The statistics of a configuration are available in partial_results while it is still evaluated, and are passed to on_partial_result every report_every samples.
+    The evaluation of a configuration stops early when on_partial_result returns True, or with early_stopping_z, when the configuration is confidently
+    worse than the best fully evaluated configuration: after min_samples scored samples, its mean + early_stopping_z * standard error is below the best mean.
+    The strategy then gets the mean of the scored samples as the score of the configuration, and the remaining samples are not run.
+    Scores must be numeric (floats, or ConfigurationScore objects that support division)
+    """
+
+    def __init__(self, max_in_flight: int = 64, quantiles: tuple[float, ...] = (0.1, 0.5, 0.9), keep_outputs: bool = False,
+                 on_partial_result: Callable[[BaseModel, OnlineStatistics], bool | None] | None = None, report_every: int = 10,
+                 early_stopping_z: float | None = None, min_samples: int = 20, **kwargs):
+        """
+        :param max_in_flight: max number of samples that run at the same time
+        :param quantiles: quantiles of the sample scores to estimate
+        :param keep_outputs: keep the program output of every sample in outputs
+        :param on_partial_result: called with the configuration and its statistics every report_every scored samples, e.g. to show progress.
+            if it returns True, the evaluation of the configuration stops and its partial mean is returned
+        :param report_every: number of scored samples between calls of on_partial_result
+        :param early_stopping_z: stop a configuration whose mean + early_stopping_z * standard error is below the best mean of a fully evaluated configuration,
+            e.g. 2 for about 97.5% one-sided confidence. None evaluates every configuration on all the samples
+        :param min_samples: number of scored samples before a configuration can be stopped by early_stopping_z
+        :param kwargs: passed to ProgramRunner, e.g. call_policy, results_store or keep_sample_scores
+        """
+        super().__init__(**kwargs)
+        self.max_in_flight: int = max_in_flight
+        self.quantiles: tuple[float, ...] = quantiles
+        self.keep_outputs: bool = keep_outputs
+        self.on_partial_result: Callable[[BaseModel, OnlineStatistics], bool | None] | None = on_partial_result
+        self.report_every: int = report_every
+        self.early_stopping_z: float | None = early_stopping_z
+        self.min_samples: int = min_samples
+        self.best_mean: float | None = None  # best mean of a fully evaluated configuration, the bar of early stopping
+        self.stopped_configs: set[str] = set()  # json of the configurations whose evaluation stopped early
+        self.partial_results: dict[str, OnlineStatistics] = {}  # configuration json to the statistics of its scores, updated while it is evaluated
+        self.outputs: dict[str, dict[int, OutputType]] = {}  # configuration json to the output of every sample by input id, only if keep_outputs
+
+    def should_stop(self, config: BaseModel, statistics: OnlineStatistics) -> bool:
+        """
+        called after every scored sample
+        :return: True if the evaluation of the configuration should stop: on_partial_result asked for it, or the configuration is confidently worse than the best one
+        """
+        if self.on_partial_result is not None and statistics.count % self.report_every == 0 and self.on_partial_result(config, statistics):
+            return True
+        return (self.early_stopping_z is not None and self.best_mean is not None and statistics.count >= self.min_samples
+                and statistics.mean + self.early_stopping_z * statistics.standard_error < self.best_mean)
+
+    async def arun(self, config: BaseModel, program: Callable, dataset: list[tuple[InputType, OutputType]], scoring_function: Callable[[OutputType, OutputType], float]) -> float:
+        logger.info({"config": config.model_dump()})
+        config_key: str = config.model_dump_json()
+        statistics: OnlineStatistics = OnlineStatistics(quantiles=self.quantiles)
+        self.partial_results[config_key] = statistics
+        if self.keep_outputs:
+            self.outputs[config_key] = {}
+        if self.keep_sample_scores:
+            self.sample_scores[config_key] = [None] * len(dataset)
+
+        async def run_indexed_sample(input_id: int, input: InputType, expected_result: OutputType) -> tuple[int, Any, OutputType | None]:
+            score, output = await self.arun_sample(executor, config, program, input_id, input, expected_result, scoring_function)
+            return input_id, score, output
+
+        executor = self.open_executor()
+        samples = enumerate(dataset)
+        pending: set[asyncio.Task] = set()
+        stopped: bool = False
+        try:
+            while not stopped:
+                # keep max_in_flight samples running, and consume them in completion order
+                for input_id, (input, expected_result) in samples:
+                    pending.add(asyncio.ensure_future(run_indexed_sample(input_id, input, expected_result)))
+                    if len(pending) >= self.max_in_flight:
+                        break
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    input_id, score, output = task.result()
+                    if self.keep_outputs and output is not None:
+                        self.outputs[config_key][input_id] = output
+                    if score is None:  # skipped by the call policy
+                        continue
+                    if self.keep_sample_scores:
+                        self.sample_scores[config_key][input_id] = score
+                    statistics.add(score_to_float(score))
+                    if self.should_stop(config, statistics):
+                        stopped = True
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+            self.close_executor(executor)
+
+        if statistics.count == 0:  # all samples failed and were skipped
+            logger.warning({"score": self.call_policy.failure_score, "reason": "all samples failed"})
+            if self.results_store is not None:
+                self.results_store.add_config(config=config, score=self.call_policy.failure_score)
+            return self.call_policy.failure_score
+        if stopped:
+            self.stopped_configs.add(config_key)
+            logger.info({"score": statistics.mean, "statistics": statistics.summary(), "stopped_early": True})
+        else:
+            self.best_mean = statistics.mean if self.best_mean is None else max(self.best_mean, statistics.mean)
+            logger.info({"score": statistics.mean, "statistics": statistics.summary()})
+        if self.results_store is not None:
+            self.results_store.add_config(config=config, score=statistics.mean)
+        return statistics.mean
@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def numeric_score(score: Any) -> float | None:
+    """ numeric value of a score, None for scores that are not numeric (e.g. an EvaluationScore with several fields) """
+    try:
+        return float(score / 1)  # ConfigurationScore objects support division, and dividing them returns a float
+    except TypeError:
+        return None
+
+
+class ResultsStore:
+    """
+    Incremental SQLite store of the results of a search
+    * configs table - one record per configuration: the configuration json and its aggregated score
+    * samples table - one record per evaluated sample: configuration, input id (index in the original dataset, before it was reduced), output, score, score fields, latency, cost and error
+    Records are buffered and written in batches, so the cost of a search does not grow with the size of the file.
+    A configuration that is evaluated again, e.g. by a later search into the same file, replaces the records of its samples instead of duplicating them.
+    Can be queried while or after the search runs, without loading all results into memory.
+    """
+
+    def __init__(self, path: str = 'results.sqlite', batch_size: int = 1000):
+        """
+        :param path: path of the SQLite file, ':memory:' for an in-memory store
+        :param batch_size: number of buffered sample records that triggers a write
+        """
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock: threading.Lock = threading.Lock()  # the store may be written from the event loop and worker threads, and read from other threads
+        self.config_ids: dict[str, int] = {}  # configuration json to its id in the configs table
+        self.pending_samples: list[tuple] = []  # sample records that were not written yet
+        with self.lock:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS configs (config_id INTEGER PRIMARY KEY, config TEXT UNIQUE NOT NULL, score REAL);
+                CREATE TABLE IF NOT EXISTS samples (
+                    config_id INTEGER NOT NULL REFERENCES configs(config_id), input_id INTEGER NOT NULL, output TEXT,
+                    score REAL, score_fields TEXT, latency REAL, cost REAL, error TEXT,
+                    PRIMARY KEY (config_id, input_id)
+                );
+            """)
+            self.connection.commit()
+
+    def get_config_id(self, config: BaseModel | dict[str, Any]) -> int:
+        """
+        :param config: configuration or configuration dictionary
+        :return: id of the configuration in the configs table, the configuration is inserted if it is new
+        """
+        config_json: str = json.dumps(config.model_dump() if isinstance(config, BaseModel) else config, sort_keys=True)
+        with self.lock:
+            if config_json not in self.config_ids:
+                self.connection.execute("INSERT OR IGNORE INTO configs (config) VALUES (?)", (config_json,))
+                self.config_ids[config_json] = self.connection.execute("SELECT config_id FROM configs WHERE config = ?", (config_json,)).fetchone()[0]
+            return self.config_ids[config_json]
+
+    def add_sample(self, config: BaseModel, input_id: int, output: Any = None, score: Any = None, latency: float | None = None, error: str | None = None) -> None:
+        """
+        buffers the record of a single evaluated sample, and writes the buffer if it is full
+        :param config: evaluated configuration
+        :param input_id: index of the sample in the original dataset
+        :param output: program output, stored as json (repr for values that are not json serializable)
+        :param score: sample score. numeric scores are stored in the score column, pydantic scores are stored as json in score_fields, and their cost field in the cost column
+        :param latency: wall time of the program call in seconds
+        :param error: the error of a sample whose program call failed
+        """
+        score_fields: dict[str, Any] | None = score.model_dump() if isinstance(score, BaseModel) else None
+        cost: float | None = score_fields.get('cost') if score_fields else None
+        record: tuple = (
+            self.get_config_id(config), input_id, json.dumps(output, default=repr), numeric_score(score) if score is not None else None,
+            json.dumps(score_fields) if score_fields is not None else None, latency, cost, error,
+        )
+        with self.lock:
+            self.pending_samples.append(record)
+            is_full: bool = len(self.pending_samples) >= self.batch_size
+        if is_full:
+            self.flush()
+
+    def add_config(self, config: BaseModel, score: Any) -> None:
+        """
+        records the aggregated score of a configuration, and commits it right away (unlike the buffered samples),
+        so it is visible to other readers of the file and kept if the search is interrupted
+        :param config: evaluated configuration
+        :param score: aggregated score of the configuration
+        """
+        config_id: int = self.get_config_id(config)
+        with self.lock:
+            self.connection.execute("UPDATE configs SET score = ? WHERE config_id = ?", (numeric_score(score), config_id))
+            self.connection.commit()
+
+    def flush(self) -> None:
+        """ writes the buffered records, replacing the previous records of the same samples """
+        with self.lock:
+            self.connection.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.pending_samples)
+            self.connection.commit()
+            self.pending_samples.clear()
+
+    def close(self) -> None:
+        """ writes the buffered records and closes the file """
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """ runs a read query on the store, after writing the buffered records """
+        self.flush()
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def top_k(self, k: int = 10) -> list[tuple[dict[str, Any], float]]:
+        """
+        :param k: number of configurations
+        :return: the k highest scoring configurations, as (configuration dictionary, score)
+        """
+        rows = self.query("SELECT config, score FROM configs WHERE score IS NOT NULL ORDER BY score DESC LIMIT ?", (k,))
+        return [(json.loads(config), score) for config, score in rows]
+
+    def observations(self) -> list[tuple[dict[str, Any], float]]:
+        """
+        :return: all scored configurations as (configuration dictionary, score), can be passed to a strategy as prior_observations
+        """
+        return [(json.loads(config), score) for config, score in self.query("SELECT config, score FROM configs WHERE score IS NOT NULL")]
+
+    def group_by_field(self, field: str) -> list[tuple[Any, float, float, int]]:
+        """
+        :param field: configuration field
+        :return: for each value of the field: (value, mean configuration score, max configuration score, number of configurations), best mean first
+        """
+        return self.query(
+            "SELECT json_extract(config, '$.' || ?) AS value, AVG(score), MAX(score), COUNT(*) FROM configs WHERE score IS NOT NULL GROUP BY value ORDER BY AVG(score) DESC",
+            (field,),
+        )
+
+    def sample_records(self, config: BaseModel | dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        :param config: configuration or configuration dictionary
+        :return: the records of all samples evaluated with the configuration, ordered by input id
+        """
+        columns: list[str] = ['input_id', 'output', 'score', 'score_fields', 'latency', 'cost', 'error']
+        config_json: str = json.dumps(config.model_dump() if isinstance(config, BaseModel) else config, sort_keys=True)
+        rows = self.query(f"SELECT {', '.join('samples.' + column for column in columns)} FROM samples JOIN configs USING (config_id) WHERE config = ? ORDER BY input_id", (config_json,))
+        records: list[dict[str, Any]] = [dict(zip(columns, row)) for row in rows]
+        for record in records:
+            record['output'] = json.loads(record['output']) if record['output'] is not None else None
+            record['score_fields'] = json.loads(record['score_fields']) if record['score_fields'] is not None else None
+        return records
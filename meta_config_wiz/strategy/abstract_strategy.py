@@ -1,9 +1,15 @@
 from pydantic import BaseModel
-from typing import Type, TypeVar, Generic, Callable
+from typing import Type, TypeVar, Generic, Callable, Awaitable, Any
 from abc import ABC, abstractmethod
+import asyncio
+import json
+
+from meta_config_wiz.configuration_utils import canonicalize_config_dict, config_dict_key
 
 # Any pydantic BaseModel. Defined here to enable using he same BaseModel for all strategies
 ConfigType = TypeVar("ConfigType", bound=BaseModel)
+# (configuration, score) or (configuration, score, weight) observation of a previous run
+PriorObservation = tuple[dict[str, Any] | BaseModel, float] | tuple[dict[str, Any] | BaseModel, float, float]
 
 
 class AbstractStrategy(ABC, Generic[ConfigType]):
@@ -12,20 +18,82 @@ class AbstractStrategy(ABC, Generic[ConfigType]):
 
     Maintainace a list of explored configurations and their result scores
     Decides which configuration to test next
+
+    Can be warm-started with (configuration, score) or (configuration, score, weight) observations of a previous run, e.g. loaded with load_observations.
+    Prior observations are not evaluated again. Their weight is multiplied by prior_discount, so strategies that model the scores trust stale observations less,
+    but their scores are never changed
     """
 
-    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = -1, **kwargs):
+    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = -1, prior_observations: list[PriorObservation] | None = None,
+                 prior_discount: float = 1.0, **kwargs):
+        assert 0 < prior_discount <= 1, "prior_discount must be in (0, 1]"
         self.config_class_type: Type[ConfigType] = config_class_type  # class of the configuration, used for generating new configuration instances
         self.max_runs: int = max_runs     # some of the strategies may want to use a maximum number of runs, they will have to set it using set_max_runs method
         self.configs: list[ConfigType] = []  # list of configurations
         self.scores: list[float] = []  # list of scores for each configuration
+        self.prior_discount: float = prior_discount  # multiplies the weight of prior observations
+        self.prior_configs: list[ConfigType] = []  # configurations evaluated by a previous run, without equivalent duplicates
+        self.prior_scores: list[float] = []  # scores of the prior configurations
+        self.prior_weights: list[float] = []  # weights of the prior configurations, their saved weight multiplied by prior_discount
+        self.prior_config_keys: set[tuple] = set()  # canonical keys of the prior configurations
+        for prior_observation in prior_observations or []:
+            prior_config, prior_score = prior_observation[0], prior_observation[1]
+            prior_weight: float = prior_observation[2] if len(prior_observation) > 2 else 1.0
+            try:
+                config_dict: dict[str, Any] = prior_config.model_dump() if isinstance(prior_config, BaseModel) else prior_config
+                config: ConfigType = self.config_class_type(**canonicalize_config_dict(self.config_class_type, config_dict))
+            except ValueError:  # the configuration class changed since the previous run and this configuration is no longer valid
+                continue
+            if self.config_key(config) in self.prior_config_keys:  # equivalent to an earlier observation, which is kept
+                continue
+            self.prior_config_keys.add(self.config_key(config))
+            self.prior_configs.append(config)
+            self.prior_scores.append(prior_score)
+            self.prior_weights.append(prior_weight * prior_discount)
+
+    def config_key(self, config: ConfigType) -> tuple:
+        """
+        :return: canonical key of the configuration, equal for configurations that differ only in inactive conditional fields
+        """
+        return config_dict_key(canonicalize_config_dict(self.config_class_type, config.model_dump()))
+
+    def prior_config_keys_in_order(self) -> list[tuple]:
+        """
+        :return: canonical keys of the prior configurations, in the order of prior_configs
+        """
+        return [self.config_key(config) for config in self.prior_configs]
+
+    def is_prior_config(self, config: ConfigType) -> bool:
+        """
+        :return: True if the configuration, or an equivalent one, was already evaluated by a previous run
+        """
+        return self.config_key(config) in self.prior_config_keys
 
     def choose_best_config(self) -> ConfigType:
         """
-        :return: highest scoring configuration
+        :return: highest scoring configuration, including prior configurations. the weights of the observations do not change their scores
         """
-        best_score: float = max(self.scores)
-        return self.configs[self.scores.index(best_score)]
+        configs: list[ConfigType] = self.configs + self.prior_configs
+        scores: list[float] = self.scores + self.prior_scores
+        best_score: float = max(scores)
+        return configs[scores.index(best_score)]
+
+    def save_observations(self, path: str) -> None:
+        """
+        Saves the configurations, their scores and their weights as a json checkpoint that can be loaded with load_observations and used to warm-start a strategy.
+        New observations get weight 1 and prior observations keep their discounted weight, so observations keep aging across runs.
+        Every configuration is saved once, the first evaluation of equivalent configurations is kept
+        :param path: path of the json file
+        """
+        observations: list[dict[str, Any]] = []
+        saved_config_keys: set[tuple] = set()
+        for config, score, weight in list(zip(self.configs, self.scores, [1.0] * len(self.configs))) + list(zip(self.prior_configs, self.prior_scores, self.prior_weights)):
+            if self.config_key(config) in saved_config_keys:
+                continue
+            saved_config_keys.add(self.config_key(config))
+            observations.append({"config": config.model_dump(), "score": score, "weight": weight})
+        with open(path, 'w') as f:
+            json.dump(observations, f, indent=4)
 
     @abstractmethod
     def run_strategy(self, func: Callable[[ConfigType], float], **kwargs) -> None:
@@ -35,3 +103,32 @@ class AbstractStrategy(ABC, Generic[ConfigType]):
         :param func: Function that takes a configuration and returns a score
         """
         pass
+
+    async def arun_strategy(self, afunc: Callable[[ConfigType], Awaitable[float]], **kwargs) -> None:
+        """
+        Runs the strategy with an async score function, awaited on the running event loop.
+        By default run_strategy runs in a worker thread, and every call of func is scheduled back on the running loop and waited for.
+        Strategies that can await afunc directly override this method.
+        :param afunc: Async function that takes a configuration and returns a score
+        """
+        loop = asyncio.get_running_loop()
+
+        def func(config: ConfigType) -> float:
+            return asyncio.run_coroutine_threadsafe(afunc(config), loop).result()
+
+        await asyncio.to_thread(self.run_strategy, func, **kwargs)
+
+
+def load_observations(path: str) -> list[tuple[dict[str, Any], float, float]]:
+    """
+    Loads (configuration dictionary, score, weight) observations saved by AbstractStrategy.save_observations
+    Checkpoints without weights get weight 1, and repeated configurations are loaded once
+    :param path: path of the json file
+    :return: list of observations, can be passed to a strategy as prior_observations
+    """
+    with open(path) as f:
+        observations: list[dict[str, Any]] = json.load(f)
+    loaded_observations: dict[str, tuple[dict[str, Any], float, float]] = {}
+    for observation in observations:
+        loaded_observations.setdefault(json.dumps(observation["config"], sort_keys=True), (observation["config"], observation["score"], observation.get("weight", 1.0)))
+    return list(loaded_observations.values())
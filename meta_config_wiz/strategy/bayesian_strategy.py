@@ -1,8 +1,10 @@
-from typing import Any, Type, Generic, Callable, get_args
-from bayes_opt import BayesianOptimization
+from typing import Any, Type, Generic, Callable, Literal, get_args
+from pydantic import BaseModel
 
-from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType
-from meta_config_wiz.configuration_utils import get_numeric_param_min, get_numeric_param_max
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType, PriorObservation
+from meta_config_wiz.strategy.surrogate.abstract_surrogate import AbstractSurrogate
+from meta_config_wiz.strategy.surrogate.surrogate_factory import surrogate_factory
+from meta_config_wiz.configuration_utils import get_numeric_param_min, get_numeric_param_max, canonicalize_config_dict, config_dict_key, low_discrepancy_config_dicts
 
 
 class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
@@ -11,6 +13,16 @@ class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
     The Bayesian optimization works where all parameters have a float range,
     To overcome this we convert all parameters to float before feeding them to the optimizer, and convert them back to their original values after getting the result
     Based on this tutorial: https://bayesian-optimization.github.io/BayesianOptimization/advanced-tour.html#2.-Dealing-with-discrete-parameters
+
+    The Gaussian process costs O(n^3) per step and imposes an order on categories.
+    For long sweeps or mostly categorical spaces, use the 'TPE', 'RandomForest' or 'ExtraTrees' surrogate instead,
+    which handle bool and Literal fields as categories and stay fast with thousands of observations
+
+    Inactive conditional fields are set to their inactive value before a configuration is built,
+    and a suggestion equivalent to an evaluated configuration gets its score without running it again
+
+    The initial points are random by default. With init_design='sobol' or 'lhs' they come from a low discrepancy design,
+    which covers the space evenly, so the surrogate starts from a better model with the same budget
     """
 
     def __init__(
@@ -18,12 +30,30 @@ class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
         config_class_type: Type[ConfigType],
         max_runs: int = -1,
         min_score: float = -1,
+        surrogate: Literal['GP', 'TPE', 'RandomForest', 'ExtraTrees'] = 'GP',
+        surrogate_kwargs: dict[str, Any] | None = None,
+        prior_observations: list[PriorObservation] | None = None,
+        prior_discount: float = 1.0,
+        init_design: Literal['random', 'sobol', 'lhs'] = 'random',
+        seed: int = 42,
     ):
         """
         Define the Bayesian optimization optimizer and a default value for invalid configurations
+        :param surrogate: 'GP' uses the Gaussian process of bayes_opt, the others use a surrogate from surrogate_factory
+        :param surrogate_kwargs: kwargs to pass to the surrogate, ignored for 'GP'
+        :param prior_observations: (configuration, score) observations of a previous run, registered with the optimizer before the search starts
+        :param prior_discount: multiplies the weight of the prior observations. the other surrogates weigh the observations directly,
+            the Gaussian process treats a prior observation of weight w as noisy, with noise variance (1 - w) / w of the score variance
+        :param init_design: design of the initial points: 'random', 'sobol' for a scrambled Sobol sequence, or 'lhs' for a Latin hypercube
+        :param seed: seed of the scrambling of the low discrepancy design
         """
-        super().__init__(config_class_type=config_class_type, max_runs=max_runs)
+        super().__init__(config_class_type=config_class_type, max_runs=max_runs, prior_observations=prior_observations, prior_discount=prior_discount)
         self.min_score: float = min_score  # will be considered as output of the optimized function if the configuration is invalid
+        self.init_design: Literal['random', 'sobol', 'lhs'] = init_design
+        self.seed: int = seed
+        self.surrogate: AbstractSurrogate | None = None if surrogate == 'GP' else surrogate_factory(
+            surrogate_name=surrogate, config_class=config_class_type, surrogate_kwargs=surrogate_kwargs
+        )
 
     def config_numeric2value(self, key: str, numeric_value: float) -> Any:
         """
@@ -38,26 +68,44 @@ class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
             Any: The original value from the configuration. The return type depends on the parameter's type:
                 - If the parameter is a float, the same float value is returned.
                 - If the parameter is an int, the value is rounded and returned as an int.
-                - If the parameter is a bool, the value is converted to a boolean.
-                - If the parameter is a Literal, the corresponding value from the possible values is returned.
+                - If the parameter is a bool, the value is rounded and converted to a boolean.
+                - If the parameter is a Literal, the value is rounded to the index of the corresponding value from the possible values.
         """
         field_info = self.config_class_type.model_fields[key]
+        # values are rounded, not truncated, so the last value of a range is not reachable only at its upper bound
         if field_info.annotation.__name__ == "float":
             return numeric_value
         elif field_info.annotation.__name__ == "int":
-            return int(numeric_value)
+            return int(round(numeric_value))
         elif field_info.annotation.__name__ == "bool":
-            return bool(int(numeric_value))
+            return bool(round(numeric_value))
         elif field_info.annotation.__name__ == "Literal":
             possible_values: list[Any] = self.config_class_type.model_fields[
                 key
             ].annotation.__args__
-            if int(numeric_value) >= len(possible_values):
+            if round(numeric_value) >= len(possible_values):
                 return possible_values[-1]
-            elif int(numeric_value) < 0:
+            elif round(numeric_value) < 0:
                 return possible_values[0]
             else:
-                return possible_values[int(numeric_value)]
+                return possible_values[round(numeric_value)]
+
+    def numeric_params2config_dict(self, numeric_params: dict[str, float]) -> dict[str, Any]:
+        """
+        :param numeric_params: A dictionary of {<param_name>: <numeric_value>} for each parameter in the configuration.
+        :return: canonical configuration dictionary with the original values
+        """
+        return canonicalize_config_dict(self.config_class_type, {key: self.config_numeric2value(key, numeric_value) for key, numeric_value in numeric_params.items()})
+
+    def config_value2numeric(self, key: str, value: Any) -> float:
+        """
+        Convert an original value of a parameter to its numeric value, the inverse of config_numeric2value.
+        Literal values are converted to their index in the possible values, bool values to 0 or 1.
+        """
+        field_info = self.config_class_type.model_fields[key]
+        if field_info.annotation.__name__ == "Literal":
+            return float(get_args(field_info.annotation).index(value))
+        return float(value)
 
     def param2numeric_range(self) -> dict[str, tuple[float, float]]:
         """
@@ -89,12 +137,37 @@ class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
                 )
         return param2numeric_range
 
+    def init_design_config_dicts(self, n: int) -> list[dict[str, Any]]:
+        """
+        :param n: number of initial points
+        :return: configuration dictionaries of the low discrepancy design, without the prior configurations. empty for a random design
+        """
+        if self.init_design == 'random':
+            return []
+        design: list[dict[str, Any]] = low_discrepancy_config_dicts(model=self.config_class_type, n=n + len(self.prior_configs), method=self.init_design, seed=self.seed)
+        return [config_dict for config_dict in design if config_dict_key(config_dict) not in self.prior_config_keys][:n]
+
     def run_strategy(self, func: Callable[[ConfigType], float], **kwargs) -> None:
         """
         maximize the score of the function func
         save configuration tested and their scores in configs and scores fields
         :param func: function that takes a configuration and returns a score
         """
+        if self.surrogate is not None:
+            self.run_surrogate_strategy(func)
+            return
+        import numpy as np
+        from bayes_opt import BayesianOptimization  # imported here, so bayes_opt is needed only when the Gaussian process is used
+        # canonical configuration key to its score, so equivalent suggestions and prior configurations are not evaluated again
+        evaluated_scores: dict[tuple, float] = {key: score for key, score in zip(self.prior_config_keys_in_order(), self.prior_scores)}
+        # noise of the prior observations that are registered with the optimizer, the noise of new observations is the default of the Gaussian process
+        prior_alphas: list[float] = []
+        base_alpha: float = 1e-6
+        new_config_keys: list[tuple] = []  # canonical keys of the configurations evaluated by this search, only they count toward the budget
+
+        def set_observations_noise(observations_number: int) -> None:
+            """ sets the noise of every observation before the Gaussian process is fitted on them. prior observations are registered first """
+            optimizer.set_gp_params(alpha=np.array(prior_alphas + [base_alpha] * (observations_number - len(prior_alphas))))
 
         # function to pass the optimizer
         def numeric_params2func_call(**kwargs) -> float:
@@ -106,14 +179,15 @@ class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
             
             If the configuration is not valid, returns the minimum score. The final output, which is the configuration with the maximum score, will be valid.
             """
+            set_observations_noise(len(optimizer.space) + 1)  # the optimizer registers the point after this call, and fits the Gaussian process before the next one
+            config_dict: dict[str, Any] = self.numeric_params2config_dict(kwargs)
+            if config_dict_key(config_dict) in evaluated_scores:
+                return evaluated_scores[config_dict_key(config_dict)]
             try:
-                config: ConfigType = self.config_class_type(
-                    **{
-                        key: self.config_numeric2value(key, numeric_value)
-                        for key, numeric_value in kwargs.items()
-                    }
-                )
-                return func(config)
+                config: ConfigType = self.config_class_type(**config_dict)
+                evaluated_scores[config_dict_key(config_dict)] = func(config)
+                new_config_keys.append(config_dict_key(config_dict))
+                return evaluated_scores[config_dict_key(config_dict)]
             except ValueError:
                 return self.min_score
 
@@ -125,23 +199,90 @@ class BayesianStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
             random_state=1,
         )
 
-        # run optimizer
-        optimizer.maximize(
-            init_points=self.max_runs // 4,
-            n_iter=self.max_runs // 4 * 3,
-        )
+        # warm-start the optimizer with the prior observations, less reliable observations are registered as noisier
+        registered_points: set[tuple] = set()
+        for prior_config, prior_score, prior_weight in zip(self.prior_configs, self.prior_scores, self.prior_weights):
+            params: dict[str, float] = {key: self.config_value2numeric(key, value) for key, value in prior_config.model_dump().items()}
+            if tuple(sorted(params.items())) in registered_points:  # the optimizer does not accept the same point twice
+                continue
+            registered_points.add(tuple(sorted(params.items())))
+            optimizer.register(params=params, target=prior_score)
+            prior_alphas.append(base_alpha + (1 - min(prior_weight, 1.0)) / prior_weight)
+        set_observations_noise(len(prior_alphas))
+
+        # queue the initial points of a low discrepancy design, they are probed before the random initial points
+        design: list[dict[str, Any]] = self.init_design_config_dicts(self.max_runs // 4)
+        for config_dict in design:
+            optimizer.probe(params={key: self.config_value2numeric(key, value) for key, value in config_dict.items()}, lazy=True)
+
+        # run optimizer: the first quarter of the runs are random (or from the low discrepancy design), the rest are suggested by the Gaussian process.
+        # Only evaluated configurations count toward the budget: a suggestion equivalent to an evaluated configuration is registered with its score,
+        # so the Gaussian process learns it, and the next point is random, so the same suggestion is not made again and again
+        init_points: int = self.max_runs // 4
+        runs: int = init_points + self.max_runs // 4 * 3
+        optimizer.maximize(init_points=init_points - len(design), n_iter=0)
+        redraw_randomly: bool = False
+        for _ in range(runs * 20):  # bounded number of points, so a small or exhausted search space ends the search
+            if len(new_config_keys) >= runs:
+                break
+            evaluated_configs_number: int = len(new_config_keys)
+            random_point: bool = len(new_config_keys) < init_points or redraw_randomly
+            optimizer.maximize(init_points=int(random_point), n_iter=int(not random_point))
+            redraw_randomly = len(new_config_keys) == evaluated_configs_number
 
         # convert results parameter dictionaries to configuration classes, save configurations and scores
-        for result_dict in optimizer.res:
+        saved_config_keys: set[tuple] = set(self.prior_config_keys)  # suggested prior configurations were not evaluated again
+        for result_dict in optimizer.res[len(prior_alphas):]:  # the prior observations are registered first
             params, score = result_dict["params"], result_dict["target"]
+            config_dict: dict[str, Any] = self.numeric_params2config_dict(params)
+            if config_dict_key(config_dict) in saved_config_keys:  # equivalent to a saved configuration
+                continue
             try:
-                config = self.config_class_type(
-                    **{
-                        key: self.config_numeric2value(key, numeric_value)
-                        for key, numeric_value in params.items()
-                    }
-                )
+                config = self.config_class_type(**config_dict)
+                saved_config_keys.add(config_dict_key(config_dict))
                 self.configs.append(config)
                 self.scores.append(score)
             except ValueError:  # skip invalid configurations
                 pass
+
+    def run_surrogate_strategy(self, func: Callable[[ConfigType], float]) -> None:
+        """
+        maximize the score of the function func using self.surrogate, with the same budget split as the Gaussian process:
+        the first quarter of the runs are random (or from the low discrepancy design), the rest are suggested by the surrogate.
+        Only evaluated configurations count toward the budget: proposals equivalent to an evaluated configuration, and invalid proposals, are drawn again
+        :param func: function that takes a configuration and returns a score
+        """
+        for prior_config, prior_score, prior_weight in zip(self.prior_configs, self.prior_scores, self.prior_weights):
+            self.surrogate.observe(canonicalize_config_dict(self.config_class_type, prior_config.model_dump()), prior_score, weight=prior_weight)
+
+        # canonical configuration key to its score, so equivalent suggestions and prior configurations are not evaluated again
+        evaluated_scores: dict[tuple, float] = {key: score for key, score in zip(self.prior_config_keys_in_order(), self.prior_scores)}
+        init_points: int = self.max_runs // 4
+        runs: int = init_points + self.max_runs // 4 * 3
+        design: list[dict[str, Any]] = self.init_design_config_dicts(init_points)
+        redraw_randomly: bool = False  # after a duplicate suggestion, the next proposal is random, so the surrogate does not propose it again and again
+        for _ in range(runs * 20):  # bounded number of proposals, so a small or exhausted search space ends the search
+            if len(self.configs) >= runs:
+                break
+            if design and len(self.configs) < init_points:
+                config_dict: dict[str, Any] = design.pop(0)
+            elif len(self.configs) < init_points or redraw_randomly:
+                config_dict: dict[str, Any] = self.surrogate.sample_random()[0]
+            else:
+                config_dict: dict[str, Any] = self.surrogate.suggest()
+            # the surrogate learns from the canonical dictionaries, so it does not model the inactive fields
+            canonical_config_dict: dict[str, Any] = canonicalize_config_dict(self.config_class_type, config_dict)
+            redraw_randomly = config_dict_key(canonical_config_dict) in evaluated_scores
+            if redraw_randomly:
+                continue
+            try:
+                config: ConfigType = self.config_class_type(**canonical_config_dict)
+            except ValueError:  # invalid configuration - let the surrogate learn to avoid it
+                evaluated_scores[config_dict_key(canonical_config_dict)] = self.min_score
+                self.surrogate.observe(canonical_config_dict, self.min_score)
+                continue
+            score: float = func(config)
+            evaluated_scores[config_dict_key(canonical_config_dict)] = score
+            self.surrogate.observe(canonical_config_dict, score)
+            self.configs.append(config)
+            self.scores.append(score)
@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Type, Generic, Callable, Awaitable
+import asyncio
+import random
+
+from pydantic import BaseModel
+
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType, PriorObservation
+from meta_config_wiz.configuration_utils import get_numeric_param_min, get_numeric_param_max, get_categorical_param_values, canonicalize_config_dict, config_dict_key
+
+
+class EvolutionaryStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
+    """
+    genetic algorithm over the configuration fields
+    Every generation, parents are chosen by tournament selection, combined by uniform crossover and mutated:
+    numeric fields get a Gaussian perturbation scaled to their range, bool and Literal fields are resampled to another value.
+    The children of a generation are evaluated concurrently, and the best `elite_size` configurations are carried to the next generation
+    with their known scores, so they are not evaluated again. Configurations equivalent to an evaluated one are never evaluated twice,
+    and the search stops after max_runs evaluations.
+    Prior observations seed the first generation with their scores.
+    """
+
+    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = 100, population_size: int = 16, elite_size: int = 2, tournament_size: int = 3,
+                 crossover_rate: float = 0.9, mutation_rate: float | None = None, mutation_scale: float = 0.2, seed: int = 42,
+                 prior_observations: list[PriorObservation] | None = None, prior_discount: float = 1.0):
+        """
+        :param population_size: number of configurations in every generation, also the number of configurations evaluated concurrently
+        :param elite_size: number of best configurations carried to the next generation without being evaluated again
+        :param tournament_size: number of configurations competing for every parent, higher exploits more
+        :param crossover_rate: probability that a child mixes two parents, otherwise it is a copy of one parent before mutation
+        :param mutation_rate: probability to mutate every field of a child. default is 1 / number of fields
+        :param mutation_scale: standard deviation of the mutation of numeric fields, as a fraction of their range
+        :param seed: seed of the random choices
+        """
+        super().__init__(config_class_type=config_class_type, max_runs=max_runs, prior_observations=prior_observations, prior_discount=prior_discount)
+        assert 0 <= elite_size < population_size, "elite_size must be smaller than population_size"
+        self.population_size: int = population_size
+        self.elite_size: int = elite_size
+        self.tournament_size: int = tournament_size
+        self.crossover_rate: float = crossover_rate
+        self.mutation_rate: float = mutation_rate if mutation_rate is not None else 1 / max(len(config_class_type.model_fields), 1)
+        self.mutation_scale: float = mutation_scale
+        self.rng: random.Random = random.Random(seed)
+
+        # canonical configuration key to its score, including the prior configurations
+        self.evaluated_scores: dict[tuple, float] = {key: score for key, score in zip(self.prior_config_keys_in_order(), self.prior_scores)}
+
+    def random_config_dict(self) -> dict[str, Any]:
+        """
+        :return: configuration dictionary sampled uniformly from the search space
+        """
+        config_dict: dict[str, Any] = {}
+        for field_name, field_info in self.config_class_type.model_fields.items():
+            match field_info.annotation.__name__:
+                case 'float':
+                    config_dict[field_name] = self.rng.uniform(get_numeric_param_min(self.config_class_type, field_name), get_numeric_param_max(self.config_class_type, field_name))
+                case 'int':
+                    config_dict[field_name] = self.rng.randint(get_numeric_param_min(self.config_class_type, field_name), get_numeric_param_max(self.config_class_type, field_name))
+                case _:
+                    config_dict[field_name] = self.rng.choice(get_categorical_param_values(self.config_class_type, field_name))
+        return config_dict
+
+    def mutate(self, config_dict: dict[str, Any]) -> dict[str, Any]:
+        """
+        :return: a copy of the configuration dictionary where every field is mutated with probability mutation_rate
+        """
+        mutated: dict[str, Any] = dict(config_dict)
+        for field_name, field_info in self.config_class_type.model_fields.items():
+            if self.rng.random() >= self.mutation_rate:
+                continue
+            match field_info.annotation.__name__:
+                case 'float' | 'int':
+                    min_value = get_numeric_param_min(self.config_class_type, field_name)
+                    max_value = get_numeric_param_max(self.config_class_type, field_name)
+                    value: float = min(max(self.rng.gauss(mutated[field_name], self.mutation_scale * (max_value - min_value)), min_value), max_value)
+                    if field_info.annotation.__name__ == 'int':
+                        value = round(value)
+                        if value == mutated[field_name]:  # a mutated int field moves at least one step, so small ranges are explored too
+                            neighbors: list[int] = [neighbor for neighbor in (value - 1, value + 1) if min_value <= neighbor <= max_value]
+                            value = self.rng.choice(neighbors) if neighbors else value
+                    mutated[field_name] = value
+                case _:
+                    other_values: list[Any] = [value for value in get_categorical_param_values(self.config_class_type, field_name) if value != mutated[field_name]]
+                    if other_values:
+                        mutated[field_name] = self.rng.choice(other_values)
+        return mutated
+
+    def crossover(self, parent_a: dict[str, Any], parent_b: dict[str, Any]) -> dict[str, Any]:
+        """
+        :return: uniform crossover of the parents: every field is taken from one of them with equal probability
+        """
+        return {field_name: parent_a[field_name] if self.rng.random() < 0.5 else parent_b[field_name] for field_name in parent_a}
+
+    def tournament(self, population: list[tuple[dict[str, Any], float]]) -> dict[str, Any]:
+        """
+        :return: the best of tournament_size configurations drawn from the population
+        """
+        contestants = self.rng.sample(population, min(self.tournament_size, len(population)))
+        return max(contestants, key=lambda individual: individual[1])[0]
+
+    def new_candidates(self, population: list[tuple[dict[str, Any], float]], n: int) -> list[ConfigType]:
+        """
+        :param population: (canonical configuration dictionary, score) of the current generation. random candidates are generated if it is empty
+        :param n: number of candidates
+        :return: up to n valid configurations that were not evaluated yet, fewer if the search space is exhausted
+        """
+        candidates: list[ConfigType] = []
+        candidate_keys: set[tuple] = set()
+        for _ in range(n * 20):  # children equivalent to evaluated configurations are drawn again, for a bounded number of attempts
+            if len(candidates) >= n:
+                break
+            if not population:
+                config_dict: dict[str, Any] = self.random_config_dict()
+            elif self.rng.random() < self.crossover_rate:
+                config_dict = self.mutate(self.crossover(self.tournament(population), self.tournament(population)))
+            else:
+                config_dict = self.mutate(self.tournament(population))
+            config_dict = canonicalize_config_dict(self.config_class_type, config_dict)
+            key: tuple = config_dict_key(config_dict)
+            if key in self.evaluated_scores or key in candidate_keys:
+                continue
+            try:
+                candidates.append(self.config_class_type(**config_dict))
+                candidate_keys.add(key)
+            except ValueError:  # invalid configuration - raises ValueError by Pydantic validator
+                pass
+        return candidates
+
+    def initial_population(self) -> list[tuple[dict[str, Any], float]]:
+        """
+        :return: the best prior configurations with their scores, empty without prior observations
+        """
+        priors: list[tuple[dict[str, Any], float]] = [(canonicalize_config_dict(self.config_class_type, config.model_dump()), score)
+                                                      for config, score in zip(self.prior_configs, self.prior_scores)]
+        return sorted(priors, key=lambda individual: individual[1], reverse=True)[:self.population_size]
+
+    def next_generation(self, population: list[tuple[dict[str, Any], float]]) -> list[ConfigType]:
+        """
+        :return: the configurations to evaluate in the next generation, within the remaining budget. empty when the search is over
+        """
+        remaining_runs: int = self.max_runs - len(self.configs)
+        if len(population) < self.population_size:  # the first generation is filled with random configurations
+            return self.new_candidates([], min(self.population_size - len(population), remaining_runs))
+        return self.new_candidates(population, min(self.population_size - self.elite_size, remaining_runs))
+
+    def select(self, population: list[tuple[dict[str, Any], float]], children: list[ConfigType], scores: list[float]) -> list[tuple[dict[str, Any], float]]:
+        """
+        records the evaluated children and builds the next population from the elites of the current one and the children
+        """
+        evaluated: list[tuple[dict[str, Any], float]] = []
+        for config, score in zip(children, scores):
+            config_dict: dict[str, Any] = canonicalize_config_dict(self.config_class_type, config.model_dump())
+            self.evaluated_scores[config_dict_key(config_dict)] = score
+            self.configs.append(config)
+            self.scores.append(score)
+            evaluated.append((config_dict, score))
+        if len(population) < self.population_size:  # the first generation keeps everyone
+            return population + evaluated
+        elites = sorted(population, key=lambda individual: individual[1], reverse=True)[:self.elite_size]
+        return elites + evaluated
+
+    def run_strategy(self, func: Callable[[ConfigType], float], **kwargs) -> None:
+        """
+        :param func: function that takes a configuration and returns a score. the configurations of a generation are evaluated in concurrent threads
+        """
+        population: list[tuple[dict[str, Any], float]] = self.initial_population()
+        with ThreadPoolExecutor(max_workers=self.population_size) as executor:
+            while children := self.next_generation(population):
+                scores: list[float] = list(executor.map(func, children))
+                population = self.select(population, children, scores)
+
+    async def arun_strategy(self, afunc: Callable[[ConfigType], Awaitable[float]], **kwargs) -> None:
+        """
+        :param afunc: async function that takes a configuration and returns a score. the configurations of a generation are awaited concurrently
+        """
+        population: list[tuple[dict[str, Any], float]] = self.initial_population()
+        while children := self.next_generation(population):
+            scores: list[float] = list(await asyncio.gather(*[afunc(config) for config in children]))
+            population = self.select(population, children, scores)
@@ -1,37 +1,50 @@
-from typing import Any, Type, Generic, Callable
+from typing import Any, Type, Generic, Callable, Awaitable
+from pydantic import BaseModel
 from sklearn.model_selection import ParameterGrid
 from random import shuffle
 
-from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType
-from meta_config_wiz.configuration_utils import model_key2k_possible_values
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType, PriorObservation
+from meta_config_wiz.configuration_utils import model_key2k_possible_values, canonicalize_config_dict, config_dict_key
 
 
 class GridStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
     """
     runs tests of on equally distributed possible values for each field in a grid search fashion
+    inactive conditional fields are set to their inactive value, so equivalent grid points are tested once
     """
 
-    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = 100):
-        super().__init__(config_class_type=config_class_type, max_runs=max_runs)
+    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = 100, prior_observations: list[PriorObservation] | None = None, prior_discount: float = 1.0):
+        super().__init__(config_class_type=config_class_type, max_runs=max_runs, prior_observations=prior_observations, prior_discount=prior_discount)
 
         # try until k = max_runs, at that point we probably don't have any more configurations to try
+        previous_grid_size: int = 0
         for k in range(1, max_runs + 1):
             # get a list of all possible configurations for this k
             key2k_possible_values: dict[str, list[Any]] = model_key2k_possible_values(model=self.config_class_type, k=k)
             cur_config_dicts: list[dict[str, Any]] = list(ParameterGrid(param_grid=key2k_possible_values))
             # shuffle because if the number of possible configurations is greater that max_runs, we want a random sample
             shuffle(cur_config_dicts)
+            seen_config_keys: set[tuple] = set()
             # try adding all configurations to the list, if we reach max_runs, break
             while len(self.configs) < max_runs and len(cur_config_dicts) > 0:
+                config_dict: dict[str, Any] = canonicalize_config_dict(self.config_class_type, cur_config_dicts.pop())
+                if config_dict_key(config_dict) in seen_config_keys:  # equivalent to a configuration we already have
+                    continue
+                seen_config_keys.add(config_dict_key(config_dict))
                 try:
-                    new_config: ConfigType = self.config_class_type(**cur_config_dicts.pop())
-                    self.configs.append(new_config)
+                    new_config: ConfigType = self.config_class_type(**config_dict)
+                    if not self.is_prior_config(new_config):  # skip configurations that were already evaluated by a previous run
+                        self.configs.append(new_config)
                 except ValueError:  # invalid configuration - raises ValueError by Pydantic validator
                     pass
 
             # if we got all configuration we need, break
             if len(self.configs) >= max_runs:
                 break
+            # if the grid did not grow since the previous k (e.g. all fields are categorical), the whole space is covered, keep it
+            if len(seen_config_keys) == previous_grid_size or k == max_runs:
+                break
+            previous_grid_size = len(seen_config_keys)
             # if we still need more configurations, clear config_dicts because we will build it from scratch next iteration
             if len(cur_config_dicts) == 0:
                 self.configs.clear()
@@ -45,3 +58,11 @@ class GridStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
             score: float = func(config)
             self.scores.append(score)
 
+    async def arun_strategy(self, afunc: Callable[[ConfigType], Awaitable[float]], **kwargs) -> None:
+        """
+        :param afunc: async function that takes a configuration and returns a score
+        """
+        for config in self.configs:
+            score: float = await afunc(config)
+            self.scores.append(score)
+
@@ -0,0 +1,45 @@
+from typing import Any, Type, Generic, Callable, Awaitable, Literal
+from pydantic import BaseModel
+
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType, PriorObservation
+from meta_config_wiz.configuration_utils import low_discrepancy_config_dicts
+
+
+class QuasiRandomStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
+    """
+    test max_runs configurations from a low discrepancy design (scrambled Sobol sequence or Latin hypercube)
+    unlike independent random sampling, the configurations cover the space evenly even for small budgets, and there are no near-duplicates
+    """
+
+    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = 100, method: Literal['sobol', 'lhs'] = 'sobol', seed: int = 42,
+                 prior_observations: list[PriorObservation] | None = None, prior_discount: float = 1.0):
+        """
+        :param method: 'sobol' for a scrambled Sobol sequence, 'lhs' for a Latin hypercube
+        :param seed: seed of the scrambling
+        """
+        super().__init__(config_class_type=config_class_type, max_runs=max_runs, prior_observations=prior_observations, prior_discount=prior_discount)
+
+        # invalid configurations will be skipped, and we wil not make another instead of them
+        for config_dict in low_discrepancy_config_dicts(model=self.config_class_type, n=max_runs, method=method, seed=seed):
+            try:
+                new_config: ConfigType = self.config_class_type(**config_dict)
+                if not self.is_prior_config(new_config):  # skip configurations that were already evaluated by a previous run
+                    self.configs.append(new_config)
+            except ValueError:  # invalid configuration - raises ValueError by Pydantic validator
+                pass
+
+    def run_strategy(self, func: Callable[[ConfigType], float], **kwargs) -> None:
+        """
+        :param func: function that takes a configuration and returns a score
+        """
+        for config in self.configs:
+            score: float = func(config)
+            self.scores.append(score)
+
+    async def arun_strategy(self, afunc: Callable[[ConfigType], Awaitable[float]], **kwargs) -> None:
+        """
+        :param afunc: async function that takes a configuration and returns a score
+        """
+        for config in self.configs:
+            score: float = await afunc(config)
+            self.scores.append(score)
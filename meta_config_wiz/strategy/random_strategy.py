@@ -1,28 +1,42 @@
-from typing import Any, Type, Generic, Callable
+from typing import Any, Type, Generic, Callable, Awaitable
+from pydantic import BaseModel
 
-from sklearn.model_selection import ParameterSampler
+from sklearn.model_selection import ParameterSampler, ParameterGrid
 
-from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType
-from meta_config_wiz.configuration_utils import model_key2k_possible_values
+from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy, ConfigType, PriorObservation
+from meta_config_wiz.configuration_utils import model_key2k_possible_values, canonicalize_config_dict, config_dict_key
 
 
 class RandomStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
-    """test random configurations for max_runs times"""
+    """
+    test random configurations for max_runs times
+    inactive conditional fields are set to their inactive value, and equivalent configurations are drawn again instead of being tested twice
+    """
 
-    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = 100):
-        super().__init__(config_class_type=config_class_type, max_runs=max_runs)
+    def __init__(self, config_class_type: Type[ConfigType], max_runs: int = 100, prior_observations: list[PriorObservation] | None = None, prior_discount: float = 1.0):
+        super().__init__(config_class_type=config_class_type, max_runs=max_runs, prior_observations=prior_observations, prior_discount=prior_discount)
 
         key2k_possible_values: dict[str, list[Any]] = model_key2k_possible_values(model=self.config_class_type, k=max_runs)
-        config_dicts: list[dict[str, Any]] = list(ParameterSampler(param_distributions=key2k_possible_values, n_iter=max_runs, random_state=42))
+        # sample more than max_runs, because some of the samples will be equivalent after canonicalization
+        n_iter: int = min(len(ParameterGrid(param_grid=key2k_possible_values)), max_runs * 10)
+        config_dicts = ParameterSampler(param_distributions=key2k_possible_values, n_iter=n_iter, random_state=42)
 
         # make a list of configuration classes out of all possible values combinations
         # invalid configurations will be skipped, and we wil not make another instead of them
         self.configs: list[ConfigType] = []
+        seen_config_keys: set[tuple] = set()
         for config_dict in config_dicts:
+            if len(seen_config_keys) >= max_runs:
+                break
+            config_dict = canonicalize_config_dict(self.config_class_type, config_dict)
+            if config_dict_key(config_dict) in seen_config_keys:  # equivalent to a configuration we already drew
+                continue
+            seen_config_keys.add(config_dict_key(config_dict))
             try:
                 # create a new configuration instance from config_dict. if we don't have it yet (we could have it already, example in the readme), add it to the list
                 new_config: ConfigType = self.config_class_type(**config_dict)
-                self.configs.append(new_config)
+                if not self.is_prior_config(new_config):  # skip configurations that were already evaluated by a previous run
+                    self.configs.append(new_config)
             # we will get an error if the config_dict is not a valid configuration
             except ValueError:
                 pass
@@ -35,4 +49,12 @@ class RandomStrategy(AbstractStrategy[ConfigType], Generic[ConfigType]):
             score: float = func(config)
             self.scores.append(score)
 
+    async def arun_strategy(self, afunc: Callable[[ConfigType], Awaitable[float]], **kwargs) -> None:
+        """
+        :param afunc: async function that takes a configuration and returns a score
+        """
+        for config in self.configs:
+            score: float = await afunc(config)
+            self.scores.append(score)
+
 
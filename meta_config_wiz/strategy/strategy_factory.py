@@ -3,12 +3,9 @@ from typing import Literal, Type
 from pydantic import BaseModel
 
 from meta_config_wiz.strategy.abstract_strategy import AbstractStrategy
-from meta_config_wiz.strategy.random_strategy import RandomStrategy
-from meta_config_wiz.strategy.grid_strategy import GridStrategy
-from meta_config_wiz.strategy.bayesian_strategy import BayesianStrategy
 
 
-def strategy_factory(strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy'], config_class: Type[BaseModel], max_runs: int = -1, strategy_kwargs: dict[str, any] | None = None) -> AbstractStrategy:
+def strategy_factory(strategy_name: Literal['RandomStrategy', 'GridStrategy', 'BayesianStrategy', 'QuasiRandomStrategy', 'EvolutionaryStrategy'], config_class: Type[BaseModel], max_runs: int = -1, strategy_kwargs: dict[str, any] | None = None) -> AbstractStrategy:
     """
     Factory method for creating strategy instances
     :param strategy_name: name of the strategy to create
@@ -16,12 +13,22 @@ def strategy_factory(strategy_name: Literal['RandomStrategy', 'GridStrategy', 'B
     :param max_runs: maximum number of runs for the strategy. some strategies may want to know it beforehand.
     :return: instance of the strategy
     """
+    # strategies are imported only when selected, so importing the package does not import their backends (sklearn, bayes_opt)
     match strategy_name:
         case 'RandomStrategy':
+            from meta_config_wiz.strategy.random_strategy import RandomStrategy
             return RandomStrategy[config_class](config_class_type=config_class, max_runs=max_runs, **(strategy_kwargs or {}))
         case 'GridStrategy':
+            from meta_config_wiz.strategy.grid_strategy import GridStrategy
             return GridStrategy[config_class](config_class_type=config_class, max_runs=max_runs, **(strategy_kwargs or {}))
         case 'BayesianStrategy':
+            from meta_config_wiz.strategy.bayesian_strategy import BayesianStrategy
             return BayesianStrategy[config_class](config_class_type=config_class, max_runs=max_runs, **(strategy_kwargs or {}))
+        case 'QuasiRandomStrategy':
+            from meta_config_wiz.strategy.quasi_random_strategy import QuasiRandomStrategy
+            return QuasiRandomStrategy[config_class](config_class_type=config_class, max_runs=max_runs, **(strategy_kwargs or {}))
+        case 'EvolutionaryStrategy':
+            from meta_config_wiz.strategy.evolutionary_strategy import EvolutionaryStrategy
+            return EvolutionaryStrategy[config_class](config_class_type=config_class, max_runs=max_runs, **(strategy_kwargs or {}))
         case _:
             raise ValueError(f"Unknown strategy name: {strategy_name}")
\ No newline at end of file
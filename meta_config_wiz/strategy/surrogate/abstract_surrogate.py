@@ -0,0 +1,111 @@
+from abc import ABC, abstractmethod
+from typing import Any, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+from meta_config_wiz.configuration_utils import get_numeric_param_min, get_numeric_param_max, get_categorical_param_values
+
+
+class AbstractSurrogate(ABC):
+    """
+    Abstract base class for a surrogate model of the score, used by the Bayesian strategy to suggest the next configuration
+
+    Works directly on configuration dictionaries: numeric fields keep their range, and bool and Literal fields are treated as categories without an order
+    Suggestions are made by generating candidates, scoring them with the surrogate, and returning the best candidate that was not observed yet
+    """
+
+    def __init__(self, config_class_type: Type[BaseModel], n_candidates: int = 256, random_state: int = 1):
+        """
+        :param config_class_type: class of the configuration
+        :param n_candidates: number of candidates scored for every suggestion
+        :param random_state: seed of the candidates generation
+        """
+        self.config_class_type: Type[BaseModel] = config_class_type
+        self.n_candidates: int = n_candidates
+        self.rng: np.random.Generator = np.random.default_rng(random_state)
+
+        # split the fields to numeric fields with their (min, max, is_int), and categorical fields with their possible values
+        self.numeric_params: dict[str, tuple[float, float, bool]] = {}
+        self.categorical_params: dict[str, list[Any]] = {}
+        for field_name, field_info in config_class_type.model_fields.items():
+            if field_info.annotation.__name__ in ["float", "int"]:
+                self.numeric_params[field_name] = (
+                    get_numeric_param_min(config_class_type, field_name),
+                    get_numeric_param_max(config_class_type, field_name),
+                    field_info.annotation.__name__ == "int",
+                )
+            else:
+                self.categorical_params[field_name] = get_categorical_param_values(config_class_type, field_name)
+
+        self.observations: list[dict[str, Any]] = []  # observed configuration dictionaries
+        self.scores: list[float] = []  # score of each observation
+        self.weights: list[float] = []  # weight of each observation, lower for less reliable observations
+
+    def observe(self, config_dict: dict[str, Any], score: float, weight: float = 1.0) -> None:
+        """
+        :param config_dict: dictionary of the observed configuration
+        :param score: score of the configuration
+        :param weight: weight of the observation in the surrogate
+        """
+        self.observations.append(config_dict)
+        self.scores.append(score)
+        self.weights.append(weight)
+
+    def sample_random(self, n: int = 1) -> list[dict[str, Any]]:
+        """
+        :param n: number of configuration dictionaries to sample
+        :return: configuration dictionaries sampled uniformly from the search space
+        """
+        columns: dict[str, np.ndarray] = {}
+        for param, (min_value, max_value, is_int) in self.numeric_params.items():
+            columns[param] = self.rng.integers(min_value, max_value + 1, size=n) if is_int else self.rng.uniform(min_value, max_value, size=n)
+        for param, values in self.categorical_params.items():
+            columns[param] = self.rng.integers(0, len(values), size=n)
+        return self.columns2config_dicts(columns)
+
+    def columns2config_dicts(self, columns: dict[str, np.ndarray]) -> list[dict[str, Any]]:
+        """
+        :param columns: param name to an array of values, where categorical params are given as indices of their possible values
+        :return: configuration dictionaries with python values
+        """
+        n = len(next(iter(columns.values()))) if columns else 0
+        config_dicts: list[dict[str, Any]] = [{} for _ in range(n)]
+        for param, (_, _, is_int) in self.numeric_params.items():
+            for config_dict, value in zip(config_dicts, columns[param].tolist()):
+                config_dict[param] = int(round(value)) if is_int else float(value)
+        for param, values in self.categorical_params.items():
+            for config_dict, index in zip(config_dicts, columns[param].tolist()):
+                config_dict[param] = values[int(index)]
+        return config_dicts
+
+    @abstractmethod
+    def generate_candidates(self, n: int) -> list[dict[str, Any]]:
+        """
+        :param n: number of candidates
+        :return: candidate configuration dictionaries, biased toward promising regions
+        """
+        pass
+
+    @abstractmethod
+    def candidates_acquisition(self, candidates: list[dict[str, Any]]) -> np.ndarray:
+        """
+        :param candidates: candidate configuration dictionaries
+        :return: acquisition value of each candidate, higher is more promising
+        """
+        pass
+
+    def suggest(self) -> dict[str, Any]:
+        """
+        :return: dictionary of the next configuration to evaluate. random while there are less than 2 observations
+        """
+        if len(self.observations) < 2:
+            return self.sample_random()[0]
+        candidates: list[dict[str, Any]] = self.generate_candidates(self.n_candidates)
+        acquisition: np.ndarray = self.candidates_acquisition(candidates)
+        observed: set[tuple] = {tuple(sorted(observation.items())) for observation in self.observations}
+        for index in np.argsort(-acquisition):
+            if tuple(sorted(candidates[index].items())) not in observed:
+                return candidates[index]
+        # all candidates were already observed, which happens when the space is small
+        return candidates[int(np.argmax(acquisition))]
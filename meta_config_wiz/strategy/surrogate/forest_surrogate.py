@@ -0,0 +1,71 @@
+from typing import Any, Type, Literal
+
+import numpy as np
+from pydantic import BaseModel
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+
+from meta_config_wiz.strategy.surrogate.abstract_surrogate import AbstractSurrogate
+
+
+class ForestSurrogate(AbstractSurrogate):
+    """
+    Random forest or extra trees regressor of the score, in the style of SMAC
+    Numeric fields are scaled to [0, 1] and categorical fields are one-hot encoded, so categories get no false order.
+    The acquisition is an upper confidence bound: mean + kappa * std of the predictions of the trees.
+    Candidates are half uniform samples and half local perturbations of the best observations.
+    Fitting costs O(trees * n log n), so suggestions stay fast with thousands of observations.
+    """
+
+    def __init__(self, config_class_type: Type[BaseModel], n_candidates: int = 256, random_state: int = 1,
+                 forest_type: Literal['RandomForest', 'ExtraTrees'] = 'RandomForest', n_estimators: int = 30, kappa: float = 1.0,
+                 perturbation_scale: float = 0.1):
+        """
+        :param forest_type: which sklearn ensemble to use
+        :param n_estimators: number of trees
+        :param kappa: weight of the standard deviation in the acquisition, higher explores more
+        :param perturbation_scale: standard deviation of the perturbation of numeric fields, as a fraction of their range.
+            also the probability to resample a categorical field
+        """
+        super().__init__(config_class_type=config_class_type, n_candidates=n_candidates, random_state=random_state)
+        self.forest_type: Literal['RandomForest', 'ExtraTrees'] = forest_type
+        self.n_estimators: int = n_estimators
+        self.kappa: float = kappa
+        self.perturbation_scale: float = perturbation_scale
+        self.random_state: int = random_state
+
+    def encode(self, config_dicts: list[dict[str, Any]]) -> np.ndarray:
+        """
+        :param config_dicts: configuration dictionaries
+        :return: matrix of the scaled numeric fields followed by the one-hot encoded categorical fields
+        """
+        columns: list[np.ndarray] = []
+        for param, (min_value, max_value, _) in self.numeric_params.items():
+            values: np.ndarray = np.array([config_dict[param] for config_dict in config_dicts], dtype=float)
+            columns.append(((values - min_value) / max(max_value - min_value, 1e-12))[:, None])
+        for param, possible_values in self.categorical_params.items():
+            one_hot: np.ndarray = np.zeros((len(config_dicts), len(possible_values)))
+            one_hot[np.arange(len(config_dicts)), [possible_values.index(config_dict[param]) for config_dict in config_dicts]] = 1
+            columns.append(one_hot)
+        return np.hstack(columns)
+
+    def generate_candidates(self, n: int) -> list[dict[str, Any]]:
+        n_local: int = n // 2
+        top_indices: np.ndarray = np.argsort(-np.array(self.scores))[:max(1, len(self.scores) // 10)]
+        parents: np.ndarray = top_indices[self.rng.integers(0, len(top_indices), size=n_local)]
+        columns: dict[str, np.ndarray] = {}
+        for param, (min_value, max_value, _) in self.numeric_params.items():
+            parent_values: np.ndarray = np.array([self.observations[index][param] for index in parents], dtype=float)
+            columns[param] = np.clip(self.rng.normal(parent_values, self.perturbation_scale * (max_value - min_value)), min_value, max_value)
+        for param, values in self.categorical_params.items():
+            parent_values: np.ndarray = np.array([values.index(self.observations[index][param]) for index in parents], dtype=int)
+            resample: np.ndarray = self.rng.random(n_local) < self.perturbation_scale
+            columns[param] = np.where(resample, self.rng.integers(0, len(values), size=n_local), parent_values)
+        return self.columns2config_dicts(columns) + self.sample_random(n - n_local)
+
+    def candidates_acquisition(self, candidates: list[dict[str, Any]]) -> np.ndarray:
+        forest_class = RandomForestRegressor if self.forest_type == 'RandomForest' else ExtraTreesRegressor
+        forest = forest_class(n_estimators=self.n_estimators, min_samples_leaf=2, random_state=self.random_state)
+        forest.fit(self.encode(self.observations), np.array(self.scores), sample_weight=np.array(self.weights))
+        encoded_candidates: np.ndarray = self.encode(candidates)
+        trees_predictions: np.ndarray = np.stack([tree.predict(encoded_candidates) for tree in forest.estimators_])
+        return trees_predictions.mean(axis=0) + self.kappa * trees_predictions.std(axis=0)
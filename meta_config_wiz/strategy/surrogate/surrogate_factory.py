@@ -0,0 +1,25 @@
+from typing import Literal, Type, Any
+
+from pydantic import BaseModel
+
+from meta_config_wiz.strategy.surrogate.abstract_surrogate import AbstractSurrogate
+
+
+def surrogate_factory(surrogate_name: Literal['TPE', 'RandomForest', 'ExtraTrees'], config_class: Type[BaseModel], surrogate_kwargs: dict[str, Any] | None = None) -> AbstractSurrogate:
+    """
+    Factory method for creating surrogate instances
+    :param surrogate_name: name of the surrogate to create
+    :param config_class: class of the configuration
+    :param surrogate_kwargs: kwargs to pass to the surrogate
+    :return: instance of the surrogate
+    """
+    # surrogates are imported only when selected, so sklearn is imported only for the tree surrogates
+    match surrogate_name:
+        case 'TPE':
+            from meta_config_wiz.strategy.surrogate.tpe_surrogate import TPESurrogate
+            return TPESurrogate(config_class_type=config_class, **(surrogate_kwargs or {}))
+        case 'RandomForest' | 'ExtraTrees':
+            from meta_config_wiz.strategy.surrogate.forest_surrogate import ForestSurrogate
+            return ForestSurrogate(config_class_type=config_class, forest_type=surrogate_name, **(surrogate_kwargs or {}))
+        case _:
+            raise ValueError(f"Unknown surrogate name: {surrogate_name}")
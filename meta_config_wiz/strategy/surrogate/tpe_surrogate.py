@@ -0,0 +1,89 @@
+from typing import Any, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+from meta_config_wiz.strategy.surrogate.abstract_surrogate import AbstractSurrogate
+
+
+class TPESurrogate(AbstractSurrogate):
+    """
+    Tree-structured Parzen Estimator
+    Splits the observations to the best `gamma` fraction and the rest, models each field with a Parzen estimator on each part,
+    and suggests the candidate that maximizes the ratio l(x)/g(x) of the densities of the good and the bad observations.
+    Numeric fields are modeled with Gaussian kernels, categorical fields with smoothed category frequencies.
+    A suggestion costs O(n_candidates * observations) per field, so it stays fast with thousands of observations.
+    Based on: Bergstra et al., Algorithms for Hyper-Parameter Optimization, 2011
+    """
+
+    def __init__(self, config_class_type: Type[BaseModel], n_candidates: int = 24, random_state: int = 1, gamma: float = 0.25, prior_weight: float = 1.0):
+        """
+        :param n_candidates: number of candidates scored for every suggestion. fewer candidates explore more
+        :param gamma: fraction of the observations considered good
+        :param prior_weight: weight of the uniform prior mixed into every density
+        """
+        super().__init__(config_class_type=config_class_type, n_candidates=n_candidates, random_state=random_state)
+        self.gamma: float = gamma
+        self.prior_weight: float = prior_weight
+
+    def split_observations(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :return: indices of the good observations and indices of the bad observations
+        """
+        order: np.ndarray = np.argsort(-np.array(self.scores))
+        n_good: int = max(1, int(np.ceil(self.gamma * len(order))))
+        return order[:n_good], order[n_good:]
+
+    def bandwidth(self, param: str, n_centers: int) -> float:
+        """ bandwidth of the Gaussian kernels of a numeric param: Scott's rule with the standard deviation of a uniform distribution over the range, shrinks as the number of kernels grows """
+        min_value, max_value, _ = self.numeric_params[param]
+        value_range: float = max(max_value - min_value, 1e-12)
+        return max(1.06 * value_range / np.sqrt(12) * max(n_centers, 1) ** (-1 / 5), value_range * 0.01)
+
+    def numeric_density(self, param: str, indices: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """ density of the observations `indices` of a numeric param at points x: a mixture of Gaussian kernels and a uniform prior """
+        min_value, max_value, _ = self.numeric_params[param]
+        value_range: float = max(max_value - min_value, 1e-12)
+        centers: np.ndarray = np.array([self.observations[index][param] for index in indices], dtype=float)
+        weights: np.ndarray = np.array([self.weights[index] for index in indices], dtype=float)
+        bandwidth: float = self.bandwidth(param, len(centers))
+        kernels: np.ndarray = np.exp(-0.5 * ((x[:, None] - centers[None, :]) / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+        return (self.prior_weight / value_range + kernels @ weights) / (self.prior_weight + weights.sum())
+
+    def categorical_probabilities(self, param: str, indices: np.ndarray) -> np.ndarray:
+        """ smoothed frequencies of the categories of a categorical param in the observations `indices` """
+        values: list[Any] = self.categorical_params[param]
+        counts: np.ndarray = np.full(len(values), self.prior_weight / len(values))
+        for index in indices:
+            counts[values.index(self.observations[index][param])] += self.weights[index]
+        return counts / counts.sum()
+
+    def generate_candidates(self, n: int) -> list[dict[str, Any]]:
+        """ sample the candidates from the density of the good observations """
+        good, _ = self.split_observations()
+        good_weights: np.ndarray = np.array([self.weights[index] for index in good], dtype=float)
+        columns: dict[str, np.ndarray] = {}
+        for param, (min_value, max_value, _) in self.numeric_params.items():
+            centers: np.ndarray = np.array([self.observations[index][param] for index in good], dtype=float)
+            bandwidth: float = self.bandwidth(param, len(centers))
+            chosen_centers: np.ndarray = centers[self.rng.choice(len(centers), size=n, p=good_weights / good_weights.sum())]
+            samples: np.ndarray = self.rng.normal(chosen_centers, bandwidth)
+            # samples outside the range are drawn from the uniform prior instead of being clipped, clipping would pile them on the bounds
+            out_of_range: np.ndarray = (samples < min_value) | (samples > max_value)
+            samples[out_of_range] = self.rng.uniform(min_value, max_value, size=int(out_of_range.sum()))
+            columns[param] = samples
+        for param, values in self.categorical_params.items():
+            columns[param] = self.rng.choice(len(values), size=n, p=self.categorical_probabilities(param, good))
+        return self.columns2config_dicts(columns)
+
+    def candidates_acquisition(self, candidates: list[dict[str, Any]]) -> np.ndarray:
+        """ log l(x) - log g(x), summed over the fields """
+        good, bad = self.split_observations()
+        acquisition: np.ndarray = np.zeros(len(candidates))
+        for param in self.numeric_params:
+            x: np.ndarray = np.array([candidate[param] for candidate in candidates], dtype=float)
+            acquisition += np.log(self.numeric_density(param, good, x)) - np.log(self.numeric_density(param, bad, x))
+        for param, values in self.categorical_params.items():
+            x: np.ndarray = np.array([values.index(candidate[param]) for candidate in candidates])
+            acquisition += np.log(self.categorical_probabilities(param, good)[x]) - np.log(self.categorical_probabilities(param, bad)[x])
+        return acquisition
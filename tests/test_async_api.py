@@ -0,0 +1,70 @@
+import asyncio
+from typing import Literal
+
+from pydantic import BaseModel
+
+from meta_config_wiz.meta_prompt_wiz import MetaPromptWiz
+from meta_config_wiz.program_runner.call_policy import CallPolicy
+from meta_config_wiz.program_runner.program_runner_factory import program_runner_factory
+
+
+class Config(BaseModel):
+    offset: Literal[0, 1, 2]
+
+
+dataset = [(i, i + 1) for i in range(10)]
+
+
+async def async_exact_score(output, expected):
+    await asyncio.sleep(0)
+    return float(output == expected)
+
+
+def test_async_program_is_awaited_on_the_caller_loop():
+    program_loops: set[asyncio.AbstractEventLoop] = set()
+
+    async def program(config: Config, input: int) -> int:
+        program_loops.add(asyncio.get_running_loop())
+        await asyncio.sleep(0.001)
+        return input + config.offset
+
+    async def search() -> tuple[Config, asyncio.AbstractEventLoop]:
+        wiz = MetaPromptWiz(config_class=Config, program=program, log_file=None)
+        best = await wiz.afind_best_configuration(dataset=dataset, scoring_function=async_exact_score, strategy_name='GridStrategy', max_runs=3)
+        return best, asyncio.get_running_loop()
+
+    best, caller_loop = asyncio.run(search())
+    assert best == Config(offset=1)
+    assert program_loops == {caller_loop}
+
+
+def test_async_program_in_a_sync_search():
+    async def program(config: Config, input: int) -> int:
+        await asyncio.sleep(0.001)
+        return input + config.offset
+
+    wiz = MetaPromptWiz(config_class=Config, program=program, log_file=None)
+    assert wiz.find_best_configuration(dataset=dataset, scoring_function=async_exact_score, strategy_name='GridStrategy', max_runs=3) == Config(offset=1)
+
+
+def test_async_program_follows_the_call_policy():
+    attempts: dict[int, int] = {}
+    cancelled: list[int] = []
+
+    async def program(config: Config, input: int) -> int:
+        attempts[input] = attempts.get(input, 0) + 1
+        if input == 0 and attempts[input] == 1:
+            raise ConnectionError("transient")
+        if input == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(input)
+                raise
+        return input + 1
+
+    runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, max_retries=1, transient_errors=(ConnectionError,), backoff_base=0.01, on_failure='skip')})
+    scores = runner.run_program_async(Config(offset=0), program, dataset[:3], async_exact_score)
+    assert scores == [1.0, 1.0]
+    assert attempts[0] == 2
+    assert cancelled == [1]
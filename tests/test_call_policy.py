@@ -0,0 +1,98 @@
+import threading
+import time
+
+from pydantic import BaseModel
+
+from meta_config_wiz.program_runner.call_policy import CallPolicy
+from meta_config_wiz.program_runner.program_runner_factory import program_runner_factory
+from meta_config_wiz.program_runner.runner_session import RunnerSession
+
+
+class Config(BaseModel):
+    factor: float = 1.0
+
+
+def exact_score(output, expected):
+    return float(output == expected)
+
+
+def test_queued_samples_do_not_time_out():
+    # 60 samples of 0.05 seconds on 5 workers take 0.6 seconds, much longer than the timeout of a single call
+    dataset = [(i, i) for i in range(60)]
+
+    def program(config, input):
+        time.sleep(0.05)
+        return input
+
+    with RunnerSession(max_workers=5) as session:
+        runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.2, on_failure='skip'), 'session': session})
+        scores = runner.run_program_async(Config(), program, dataset, exact_score)
+    assert len(scores) == 60
+    assert sum(scores) == 60
+
+
+def test_queued_samples_are_not_hedged():
+    dataset = [(i, i) for i in range(40)]
+    calls_number = 0
+    lock = threading.Lock()
+
+    def program(config, input):
+        nonlocal calls_number
+        with lock:
+            calls_number += 1
+        time.sleep(0.02)
+        return input
+
+    with RunnerSession(max_workers=4) as session:
+        runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(hedge=True, hedge_min_samples=1, hedge_quantile=0.5), 'session': session})
+        runner.latencies.extend([0.2] * 1000)  # fills the latency window, so the threshold stays far above the time of a running call
+        runner.run_program_async(Config(), program, dataset, exact_score)
+    assert calls_number == 40
+
+
+def test_slow_calls_are_hedged():
+    calls_number = 0
+    lock = threading.Lock()
+
+    def program(config, input):
+        nonlocal calls_number
+        with lock:
+            calls_number += 1
+            first_call = calls_number == 1
+        time.sleep(0.5 if first_call else 0.01)
+        return input
+
+    runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(hedge=True, hedge_min_samples=1)})
+    runner.latencies.extend([0.01] * 10)
+    start = time.perf_counter()
+    assert runner.run_program_async(Config(), program, [(1, 1)], exact_score) == [1.0]
+    assert time.perf_counter() - start < 0.4
+    assert calls_number == 2
+
+
+def test_transient_errors_are_retried():
+    failures = {0: 2}  # input 0 fails twice before it succeeds
+
+    def program(config, input):
+        if failures.get(input, 0) > 0:
+            failures[input] -= 1
+            raise ConnectionError("connection reset")
+        return input
+
+    runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(max_retries=2, backoff_base=0.01)})
+    assert runner.run_program_async(Config(), program, [(0, 0), (1, 1)], exact_score) == [1.0, 1.0]
+
+
+def test_failed_samples_follow_the_call_policy():
+    def program(config, input):
+        if input == 0:
+            time.sleep(1)
+        if input == 1:
+            raise ValueError("bad input")
+        return input
+
+    dataset = [(0, 0), (1, 1), (2, 2)]
+    skip_runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, on_failure='skip')})
+    assert skip_runner.run_program_async(Config(), program, dataset, exact_score) == [1.0]
+    score_runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, on_failure='score', failure_score=-1.0)})
+    assert score_runner.run(Config(), program, dataset, exact_score) == -1 / 3
@@ -0,0 +1,73 @@
+from typing import Literal
+
+import pytest
+from pydantic import BaseModel, Field
+
+from meta_config_wiz.configuration_utils import canonicalize_config_dict, conditional_field, validate_model_conditions
+from meta_config_wiz.strategy.strategy_factory import strategy_factory
+
+
+class Config(BaseModel):
+    style: Literal['concise', 'instructive', 'detailed']
+    examples: Literal[1, 10, 20] = conditional_field(active_if={'style': ['instructive', 'detailed']}, inactive_value=1)
+    temperature: float = Field(ge=0, le=1)
+
+
+def is_canonical(config: Config) -> bool:
+    return canonicalize_config_dict(Config, config.model_dump()) == config.model_dump()
+
+
+def test_inactive_fields_collapse_into_one_configuration():
+    validate_model_conditions(Config)
+    assert canonicalize_config_dict(Config, {'style': 'concise', 'examples': 20, 'temperature': 0.5}) == {'style': 'concise', 'examples': 1, 'temperature': 0.5}
+    assert canonicalize_config_dict(Config, {'style': 'detailed', 'examples': 20, 'temperature': 0.5})['examples'] == 20
+
+
+def test_cyclic_conditions_are_rejected():
+    class CyclicConfig(BaseModel):
+        a: bool = conditional_field(active_if={'b': [True]}, inactive_value=False)
+        b: bool = conditional_field(active_if={'a': [True]}, inactive_value=False)
+
+    with pytest.raises(AssertionError, match="cycle"):
+        validate_model_conditions(CyclicConfig)
+
+
+@pytest.mark.parametrize("strategy_name, strategy_kwargs", [
+    ('RandomStrategy', {}),
+    ('GridStrategy', {}),
+    ('QuasiRandomStrategy', {}),
+    ('EvolutionaryStrategy', {'population_size': 4}),
+    ('BayesianStrategy', {}),
+    ('BayesianStrategy', {'surrogate': 'TPE'}),
+    ('BayesianStrategy', {'surrogate': 'RandomForest'}),
+])
+def test_strategies_evaluate_canonical_configurations_once(strategy_name, strategy_kwargs):
+    evaluated: list[Config] = []
+
+    def func(config: Config) -> float:
+        evaluated.append(config)
+        return config.temperature + (config.style == 'detailed') * config.examples / 20
+
+    strategy = strategy_factory(strategy_name, Config, max_runs=12, strategy_kwargs=strategy_kwargs)
+    strategy.run_strategy(func)
+    assert evaluated and all(is_canonical(config) for config in evaluated)
+    assert len({config.model_dump_json() for config in evaluated}) == len(evaluated)
+
+
+@pytest.mark.parametrize("surrogate", ['GP', 'TPE', 'RandomForest'])
+def test_surrogate_strategy_spends_the_whole_budget_on_new_configurations(surrogate):
+    class SmallConfig(BaseModel):
+        style: Literal['concise', 'instructive', 'detailed']
+        examples: Literal[1, 10, 20] = conditional_field(active_if={'style': ['instructive', 'detailed']}, inactive_value=1)
+        verbose: bool
+
+    # 18 combinations, only 14 of them are distinct, so duplicate proposals must not use the budget
+    strategy = strategy_factory('BayesianStrategy', SmallConfig, max_runs=12, strategy_kwargs={'surrogate': surrogate})
+    strategy.run_strategy(lambda config: (config.style == 'detailed') + config.examples / 20 + config.verbose)
+    assert len(strategy.configs) == 12
+    assert len({config.model_dump_json() for config in strategy.configs}) == 12
+
+    # the search ends when the space is exhausted
+    strategy = strategy_factory('BayesianStrategy', SmallConfig, max_runs=40, strategy_kwargs={'surrogate': surrogate})
+    strategy.run_strategy(lambda config: float(config.verbose))
+    assert len(strategy.configs) == 14
@@ -0,0 +1,54 @@
+from collections import Counter
+
+import pytest
+from pydantic import BaseModel, Field
+
+from meta_config_wiz.dataset_reduction.dataset_reducer_factory import dataset_reducer_factory
+from meta_config_wiz.dataset_reduction.paired_statistics import paired_comparison
+from meta_config_wiz.meta_prompt_wiz import MetaPromptWiz
+
+
+def test_stratified_reducer_keeps_strata_proportions():
+    dataset = [(i, "hard" if i % 4 == 0 else "easy") for i in range(400)]
+    reducer = dataset_reducer_factory('Stratified', {'sample_size': 40, 'stratify_function': lambda input, truth: truth})
+    reduced = reducer.reduce(dataset)
+    assert len(reduced) == 40
+    assert Counter(truth for _, truth in reduced) == {"easy": 30, "hard": 10}
+    assert reduced == reducer.reduce(dataset)  # the subset and its order are deterministic
+
+
+def test_coreset_reducer_covers_the_clusters():
+    dataset = [(center + offset * 0.01, None) for center in (0, 10, 20) for offset in range(30)]
+    reducer = dataset_reducer_factory('Coreset', {'sample_size': 3, 'feature_function': lambda input, truth: [input]})
+    assert sorted(round(input / 10) for input, _ in reducer.reduce(dataset)) == [0, 1, 2]
+
+
+def test_small_dataset_is_not_reduced():
+    dataset = [(i, i) for i in range(5)]
+    assert dataset_reducer_factory('Stratified', {'sample_size': 10, 'stratify_function': lambda input, truth: 0}).reduce(dataset) == dataset
+
+
+def test_paired_comparison_skips_unscored_samples():
+    comparison = paired_comparison([1.0, 0.5, None, 1.0, 0.8], [0.5, 0.5, 1.0, 0.0, 0.4])
+    assert comparison.samples_number == 4
+    assert comparison.mean_difference == pytest.approx((0.5 + 0 + 1.0 + 0.4) / 4)
+
+
+class Config(BaseModel):
+    factor: float = Field(ge=0, le=1)
+
+
+def test_sample_scores_are_kept_only_on_request():
+    dataset = [(i, i * 0.5) for i in range(10)]
+    wiz = MetaPromptWiz(config_class=Config, program=lambda config, input: input * config.factor, log_file=None)
+    score = lambda output, expected: -abs(output - expected)
+
+    wiz.find_best_configuration(dataset, score, strategy_name='GridStrategy', max_runs=3)
+    assert wiz.program_runner.sample_scores == {}
+    with pytest.raises(AssertionError, match="keep_sample_scores"):
+        wiz.compare_configurations(Config(factor=0.0), Config(factor=0.5))
+
+    wiz.find_best_configuration(dataset, score, strategy_name='GridStrategy', max_runs=3, program_runner_kwargs={'keep_sample_scores': True})
+    evaluated = wiz.strategy.configs
+    comparison = wiz.compare_configurations(evaluated[0], evaluated[1])
+    assert comparison.samples_number == 10
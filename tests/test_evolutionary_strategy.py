@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from meta_config_wiz.strategy.strategy_factory import strategy_factory
+
+
+class Config(BaseModel):
+    temperature: float = Field(ge=0, le=1)
+    examples: int = Field(ge=0, le=20)
+    style: Literal['short', 'long', 'detailed']
+    verbose: bool
+
+
+def score(config: Config) -> float:
+    return -abs(config.temperature - 0.7) - abs(config.examples - 12) / 20 + (config.style == 'detailed') + 0.2 * config.verbose
+
+
+def test_generations_improve_and_respect_the_budget():
+    strategy = strategy_factory('EvolutionaryStrategy', Config, max_runs=100, strategy_kwargs={'population_size': 10, 'elite_size': 2})
+    strategy.run_strategy(score)
+    assert len(strategy.configs) == len(strategy.scores) == 100
+    assert len({config.model_dump_json() for config in strategy.configs}) == 100
+    assert max(strategy.scores[-30:]) > max(strategy.scores[:10])
+    assert max(strategy.scores) > 1.0
+
+
+def test_children_of_a_generation_are_evaluated_concurrently():
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def slow_score(config: Config) -> float:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return score(config)
+
+    strategy = strategy_factory('EvolutionaryStrategy', Config, max_runs=24, strategy_kwargs={'population_size': 8})
+    strategy.run_strategy(slow_score)
+    assert max_running > 1
+
+    async def async_score(config: Config) -> float:
+        await asyncio.sleep(0.01)
+        return score(config)
+
+    strategy = strategy_factory('EvolutionaryStrategy', Config, max_runs=24, strategy_kwargs={'population_size': 8})
+    start = time.perf_counter()
+    asyncio.run(strategy.arun_strategy(async_score))
+    assert len(strategy.configs) == 24
+    assert time.perf_counter() - start < 24 * 0.01
+
+
+def test_prior_observations_seed_the_first_generation():
+    prior = {'temperature': 0.7, 'examples': 12, 'style': 'detailed', 'verbose': True}
+    strategy = strategy_factory('EvolutionaryStrategy', Config, max_runs=20, strategy_kwargs={'population_size': 4, 'prior_observations': [(prior, score(Config(**prior)))]})
+    strategy.run_strategy(score)
+    assert Config(**prior) not in strategy.configs
+    assert strategy.choose_best_config() == Config(**prior)
+
+
+def test_small_spaces_end_the_search():
+    class SmallConfig(BaseModel):
+        style: Literal['short', 'long']
+        verbose: bool
+
+    strategy = strategy_factory('EvolutionaryStrategy', SmallConfig, max_runs=50, strategy_kwargs={'population_size': 4})
+    strategy.run_strategy(lambda config: float(config.verbose))
+    assert len(strategy.configs) == 4
@@ -0,0 +1,8 @@
+from benchmarks.import_time_benchmark import measure_import
+
+
+def test_importing_the_package_is_lightweight(tmp_path):
+    result = measure_import(str(tmp_path))
+    assert result['heavy_modules'] == []
+    assert result['log_handlers'] == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from meta_config_wiz.program_runner.call_policy import CallPolicy
+from meta_config_wiz.program_runner.program_runner_factory import program_runner_factory
+from meta_config_wiz.program_runner.runner_session import RunnerSession
+
+
+class Config(BaseModel):
+    delay: float = 0.0
+
+
+def exact_score(output, expected):
+    return float(output == expected)
+
+
+def test_objective_penalizes_the_latency_percentile():
+    def program(config: Config, input: int) -> int:
+        time.sleep(config.delay)
+        return input
+
+    dataset = [(i, i) for i in range(10)]
+    runner = program_runner_factory('Latency', {'latency_weight': 2.0, 'latency_percentile': 'p95'})
+    objective = runner.run(Config(delay=0.05), program, dataset, exact_score)
+    report = runner.latency_reports[Config(delay=0.05).model_dump_json()]
+    assert report.quality == 1.0
+    assert report.samples_number == 10
+    assert 0.05 <= report.program_p50 <= report.program_p95 <= report.program_p99 < 0.5
+    assert objective == pytest.approx(1.0 - 2.0 * report.program_p95)
+    assert runner.sample_timings == {}
+
+
+def test_timings_are_dropped_when_the_evaluation_fails():
+    def failing_program(config: Config, input: int) -> int:
+        raise ValueError("bug")
+
+    runner = program_runner_factory('Latency', {'call_policy': CallPolicy(on_failure='skip')})
+    assert runner.run(Config(), failing_program, [(0, 0)], exact_score) == 0.0
+    assert runner.sample_timings == {}
+
+    runner = program_runner_factory('Latency')
+    with pytest.raises(ValueError):
+        runner.run(Config(), failing_program, [(0, 0)], exact_score)
+    assert runner.sample_timings == {}
+
+
+def test_latency_includes_retries_and_hedging():
+    attempts: dict[int, int] = {}
+    lock = threading.Lock()
+
+    def program(config: Config, input: int) -> int:
+        with lock:
+            attempts[input] = attempts.get(input, 0) + 1
+            attempt = attempts[input]
+        if input == 0 and attempt == 1:  # a transient error after 0.1 seconds, then a fast retry
+            time.sleep(0.1)
+            raise ConnectionError("transient")
+        if input == 1 and attempt == 1:  # a slow call, that loses to its hedged duplicate
+            time.sleep(0.5)
+        return input
+
+    policy = CallPolicy(max_retries=1, backoff_base=0, hedge=True, hedge_min_samples=1, hedge_quantile=0.5)
+    with RunnerSession(max_workers=4) as session:
+        runner = program_runner_factory('Latency', {'call_policy': policy, 'session': session})
+        runner.latencies.extend([0.1] * 1000)  # the hedging threshold stays at 0.1 seconds
+        runner.run(Config(), program, [(0, 0), (1, 1), (2, 2)], exact_score)
+        report = runner.latency_reports[Config().model_dump_json()]
+    # the user waited at least 0.1 seconds for inputs 0 and 1, although the calls that succeeded were instant
+    assert report.program_p50 >= 0.1
+    assert report.program_p99 < 0.5
+    assert attempts == {0: 2, 1: 2, 2: 1}
+
+
+def test_latency_does_not_include_slow_scoring_of_other_samples():
+    def program(config: Config, input: int) -> int:
+        time.sleep(0.01)
+        return input
+
+    def slow_score(output, expected):  # a sync scoring function runs on the event loop, and holds it
+        time.sleep(0.05)
+        return float(output == expected)
+
+    dataset = [(i, i) for i in range(20)]
+    with RunnerSession(max_workers=20) as session:
+        runner = program_runner_factory('Latency', {'session': session})
+        runner.run(Config(), program, dataset, slow_score)
+    report = runner.latency_reports[Config().model_dump_json()]
+    assert report.samples_number == 20
+    assert report.program_p95 < 0.1
+    assert report.scoring_p50 >= 0.05
@@ -0,0 +1,58 @@
+import random
+from typing import Literal, get_args
+
+from pydantic import BaseModel, Field
+
+from meta_config_wiz.analysis.parameter_importance import parameter_importance
+from meta_config_wiz.analysis.search_space_reduction import reduce_search_space
+from meta_config_wiz.configuration_utils import conditional_field, get_numeric_param_min, get_numeric_param_max, validate_model_conditions
+from meta_config_wiz.strategy.strategy_factory import strategy_factory
+
+
+class Config(BaseModel):
+    temperature: float = Field(ge=0, le=1)
+    examples: int = Field(ge=0, le=20)
+    style: Literal['short', 'long', 'detailed']
+    selector: Literal['random', 'similar'] = conditional_field(active_if={'style': ['long', 'detailed']}, inactive_value='random')
+    verbose: bool
+
+
+def score(config: Config) -> float:
+    # only temperature and style matter
+    return -10 * abs(config.temperature - 0.7) + 2 * (config.style == 'detailed')
+
+
+def searched_strategy():
+    random.seed(0)  # the random strategy samples the values of categorical fields with the global random generator
+    strategy = strategy_factory('RandomStrategy', Config, max_runs=80)
+    strategy.run_strategy(score)
+    return strategy
+
+
+def test_importance_finds_the_fields_that_matter():
+    importances = parameter_importance(searched_strategy())
+    assert set(importances) == set(Config.model_fields)
+    assert abs(sum(importances.values()) - 1) < 1e-9
+    assert set(list(importances)[:2]) == {'temperature', 'style'}
+    assert importances['verbose'] < 0.05 and importances['examples'] < 0.05
+
+
+def test_reduced_search_space_pins_unimportant_fields_and_narrows_ranges():
+    strategy = searched_strategy()
+    best_config = strategy.choose_best_config()
+    reduced_class = reduce_search_space(strategy)
+    validate_model_conditions(reduced_class)
+    assert issubclass(reduced_class, Config)
+
+    # unimportant fields are pinned to their best value, conditional fields keep their inactive value
+    assert get_args(reduced_class.model_fields['verbose'].annotation) == (best_config.verbose,)
+    assert 'random' in get_args(reduced_class.model_fields['selector'].annotation)
+    # the important numeric field is narrowed around the best configurations, within the original range
+    assert 0 <= get_numeric_param_min(reduced_class, 'temperature') <= best_config.temperature <= get_numeric_param_max(reduced_class, 'temperature') <= 1
+    assert get_numeric_param_max(reduced_class, 'temperature') - get_numeric_param_min(reduced_class, 'temperature') < 0.5
+    # the important categorical field keeps all its values
+    assert reduced_class.model_fields['style'].annotation == Config.model_fields['style'].annotation
+
+    follow_up = strategy_factory('GridStrategy', reduced_class, max_runs=10)
+    follow_up.run_strategy(score)
+    assert all(config.verbose == best_config.verbose for config in follow_up.configs)
@@ -0,0 +1,60 @@
+import random
+from typing import Literal
+
+import numpy as np
+import pytest
+from pydantic import BaseModel, Field
+from scipy.stats import qmc
+
+from meta_config_wiz.configuration_utils import low_discrepancy_config_dicts
+from meta_config_wiz.strategy.strategy_factory import strategy_factory
+
+
+class Config(BaseModel):
+    temperature: float = Field(ge=0, le=1)
+    top_p: float = Field(ge=0, le=1)
+    style: Literal['short', 'long', 'detailed', 'bullets']
+
+
+def test_latin_hypercube_stratifies_every_field():
+    config_dicts = low_discrepancy_config_dicts(Config, n=16, method='lhs')
+    assert len(config_dicts) == 16
+    for field in ('temperature', 'top_p'):
+        assert sorted(int(config_dict[field] * 16) for config_dict in config_dicts) == list(range(16))
+    assert sorted(config_dict['style'] for config_dict in config_dicts) == sorted(['short', 'long', 'detailed', 'bullets'] * 4)
+
+
+def test_sobol_covers_the_space_more_evenly_than_random_sampling():
+    class NumericConfig(BaseModel):
+        x: float = Field(ge=0, le=1)
+        y: float = Field(ge=0, le=1)
+        z: float = Field(ge=0, le=1)
+
+    sobol_points = np.array([[config_dict[field] for field in ('x', 'y', 'z')] for config_dict in low_discrepancy_config_dicts(NumericConfig, n=64)])
+    rng = random.Random(0)
+    random_discrepancies = [qmc.discrepancy(np.array([[rng.random() for _ in range(3)] for _ in range(64)])) for _ in range(10)]
+    assert qmc.discrepancy(sobol_points) < min(random_discrepancies)
+
+
+@pytest.mark.parametrize("method", ['sobol', 'lhs'])
+def test_small_spaces_return_every_distinct_configuration_once(method):
+    class SmallConfig(BaseModel):
+        style: Literal['short', 'long', 'detailed']
+        verbose: bool
+
+    config_dicts = low_discrepancy_config_dicts(SmallConfig, n=20, method=method)
+    assert len({tuple(sorted(config_dict.items())) for config_dict in config_dicts}) == len(config_dicts) == 6
+
+
+def test_quasi_random_strategy_skips_prior_configurations():
+    design = low_discrepancy_config_dicts(Config, n=8)
+    strategy = strategy_factory('QuasiRandomStrategy', Config, max_runs=8, strategy_kwargs={'prior_observations': [(design[0], 1.0)]})
+    strategy.run_strategy(lambda config: config.temperature)
+    assert [config.model_dump() for config in strategy.configs] == design[1:]
+    assert len(strategy.scores) == 7
+
+
+def test_bayesian_strategy_starts_from_the_design():
+    strategy = strategy_factory('BayesianStrategy', Config, max_runs=16, strategy_kwargs={'surrogate': 'TPE', 'init_design': 'sobol'})
+    strategy.run_strategy(lambda config: config.temperature + config.top_p)
+    assert [config.model_dump() for config in strategy.configs[:4]] == low_discrepancy_config_dicts(Config, n=4, method='sobol')
@@ -0,0 +1,66 @@
+import threading
+
+from pydantic import BaseModel
+
+from meta_config_wiz.meta_prompt_wiz import MetaPromptWiz
+from meta_config_wiz.results_store.results_store import ResultsStore
+
+
+class Config(BaseModel):
+    offset: int = 0
+
+
+def test_concurrent_writes_are_all_recorded():
+    store = ResultsStore(':memory:', batch_size=7)
+    configs = [Config(offset=offset) for offset in range(4)]
+
+    def write(config: Config) -> None:
+        for input_id in range(500):
+            store.add_sample(config=config, input_id=input_id, output=input_id, score=1.0, latency=0.01)
+
+    threads = [threading.Thread(target=write, args=(config,)) for config in configs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.query("SELECT COUNT(*) FROM samples") == [(2000,)]
+    assert [record['input_id'] for record in store.sample_records(configs[0])] == list(range(500))
+
+
+def test_reevaluated_configurations_replace_their_records(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    for run in range(2):
+        with ResultsStore(path) as store:
+            for input_id in range(3):
+                store.add_sample(config=Config(), input_id=input_id, output=f"run {run}", score=float(run))
+            store.add_config(config=Config(), score=float(run))
+
+    with ResultsStore(path) as store:
+        records = store.sample_records(Config())
+        assert [(record['input_id'], record['output'], record['score']) for record in records] == [(input_id, "run 1", 1.0) for input_id in range(3)]
+        assert store.top_k() == [({'offset': 0}, 1.0)]
+
+
+def test_configuration_scores_are_committed_without_flushing(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    store = ResultsStore(path)
+    store.add_config(config=Config(offset=1), score=0.5)
+    # another reader of the file, e.g. a search that was interrupted before the store was flushed or closed
+    with ResultsStore(path) as reader:
+        assert reader.top_k() == [({'offset': 1}, 0.5)]
+    store.close()
+
+
+def test_reduced_dataset_samples_are_stored_with_their_original_index():
+    dataset = [(i, i % 3) for i in range(30)]
+    wiz = MetaPromptWiz(config_class=Config, program=lambda config, input: input, log_file=None)
+    store = ResultsStore(':memory:')
+    wiz.find_best_configuration(dataset=dataset, scoring_function=lambda output, expected: float(output % 3 == expected), strategy_name='GridStrategy', max_runs=1,
+                                program_runner_kwargs={'results_store': store},
+                                dataset_reducer_name='Stratified', dataset_reducer_kwargs={'sample_size': 9, 'stratify_function': lambda input, truth_output: truth_output})
+
+    records = store.sample_records(Config())
+    assert len(records) == 9
+    # the program output is the input, which is the index of the sample in the original dataset
+    assert all(record['output'] == record['input_id'] for record in records)
+    assert [record['input_id'] for record in records] != list(range(9))
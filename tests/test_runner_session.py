@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+from pydantic import BaseModel
+
+from meta_config_wiz.program_runner.call_policy import CallPolicy
+from meta_config_wiz.program_runner.program_runner_factory import program_runner_factory
+from meta_config_wiz.program_runner.runner_session import RunnerSession, worker_resources
+
+
+class Config(BaseModel):
+    hang: bool = False
+
+
+def exact_score(output, expected):
+    return float(output == expected)
+
+
+def test_workers_share_their_resources_across_configurations():
+    created: list[dict] = []
+    torn_down: list[dict] = []
+
+    def initializer() -> dict:
+        resources = {'client': len(created)}
+        created.append(resources)
+        return resources
+
+    def program(config: Config, input: int) -> int:
+        assert worker_resources() in created
+        return input
+
+    with RunnerSession(max_workers=3, worker_initializer=initializer, worker_teardown=torn_down.append) as session:
+        runner = program_runner_factory('AllMean', {'session': session})
+        for _ in range(5):
+            assert runner.run(Config(), program, [(i, i) for i in range(20)], exact_score) == 1.0
+    assert len(created) == 3
+    assert sorted(resources['client'] for resources in torn_down) == [0, 1, 2]
+
+
+def test_timed_out_calls_do_not_starve_later_configurations():
+    release = threading.Event()
+
+    def program(config: Config, input: int) -> int:
+        if config.hang:
+            release.wait(10)
+        return input
+
+    dataset = [(i, i) for i in range(4)]
+    with RunnerSession(max_workers=2) as session:
+        runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, on_failure='skip'), 'session': session})
+        assert runner.run(Config(hang=True), program, dataset, exact_score) == 0.0  # all samples timed out and were skipped
+        start = time.perf_counter()
+        assert runner.run(Config(), program, dataset, exact_score) == 1.0
+        assert time.perf_counter() - start < 1
+        assert len(session.executor.workers) == 2
+        release.set()
+
+
+def test_resources_of_hanging_workers_are_not_torn_down():
+    release = threading.Event()
+    torn_down: list[str] = []
+
+    def initializer() -> dict:
+        return {'worker': threading.current_thread().name}
+
+    def program(config: Config, input: int) -> int:
+        if config.hang:
+            release.wait(10)
+        return input
+
+    session = RunnerSession(max_workers=2, worker_initializer=initializer, worker_teardown=lambda resources: torn_down.append(resources['worker']), teardown_timeout=0.2)
+    runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, on_failure='skip'), 'session': session})
+    runner.run(Config(hang=True), program, [(0, 0)], exact_score)
+    runner.run(Config(), program, [(i, i) for i in range(4)], exact_score)
+    hanging_worker = next(iter(session.executor.retired_workers))
+    session.close()
+    assert hanging_worker.is_alive()
+    assert hanging_worker.name not in torn_down
+    assert len(torn_down) == 2
+    release.set()
+    hanging_worker.join(1)
+    assert not hanging_worker.is_alive()
+
+
+def test_close_does_not_wait_for_hanging_workers_without_teardown():
+    release = threading.Event()
+
+    def program(config: Config, input: int) -> int:
+        release.wait(10)
+        return input
+
+    session = RunnerSession(max_workers=2)
+    runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, on_failure='skip'), 'session': session})
+    runner.run(Config(hang=True), program, [(0, 0)], exact_score)
+    start = time.perf_counter()
+    session.close()
+    assert time.perf_counter() - start < 0.5
+    release.set()
+
+
+def test_async_close_does_not_block_the_event_loop():
+    release = threading.Event()
+
+    def program(config: Config, input: int) -> int:
+        release.wait(10)
+        return input
+
+    async def close_while_ticking() -> float:
+        ticks: list[float] = []
+
+        async def tick() -> None:
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async with RunnerSession(max_workers=2, worker_teardown=lambda resources: None, teardown_timeout=0.5) as session:
+            runner = program_runner_factory('AllMean', {'call_policy': CallPolicy(timeout=0.1, on_failure='skip'), 'session': session})
+            await runner.arun(Config(hang=True), program, [(0, 0)], exact_score)
+            ticker = asyncio.ensure_future(tick())
+        ticker.cancel()
+        return max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+
+    assert asyncio.run(close_while_ticking()) < 0.25
+    release.set()
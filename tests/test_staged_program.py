@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from meta_config_wiz.program_runner.staged_program import Stage, StagedProgram
+
+
+class Config(BaseModel):
+    selector: Literal['random', 'similar']
+    llm: Literal['small', 'large']
+
+
+def test_stage_outputs_are_reused_by_configurations_that_agree_on_their_fields():
+    calls: dict[str, int] = {'examples': 0, 'answer': 0}
+
+    def select_examples(config, input, outputs):
+        calls['examples'] += 1
+        return f"{config.selector} examples of {input}"
+
+    def answer(config, input, outputs):
+        calls['answer'] += 1
+        return f"{config.llm} answer with {outputs['examples']}"
+
+    program = StagedProgram(stages=[
+        Stage(name='examples', function=select_examples, depends_on=['selector'], config_class=Config),
+        Stage(name='answer', function=answer, depends_on=['llm'], config_class=Config),
+    ])
+    for selector in ('random', 'similar'):
+        for llm in ('small', 'large'):
+            assert program(Config(selector=selector, llm=llm), 'q') == f"{llm} answer with {selector} examples of q"
+    assert calls == {'examples': 2, 'answer': 4}
+    assert (program.hits, program.misses) == (2, 6)
+
+
+def test_concurrent_calls_compute_a_stage_once_and_count_every_hit():
+    calls_number = 0
+    release = threading.Event()
+
+    def slow_stage(config, input, outputs):
+        nonlocal calls_number
+        calls_number += 1
+        release.wait(5)
+        return input
+
+    program = StagedProgram(stages=[Stage(name='slow', function=slow_stage, depends_on=['selector'])])
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [executor.submit(program, Config(selector='random', llm='small'), 'q') for _ in range(200)]
+        release.set()
+        assert [future.result() for future in futures] == ['q'] * 200
+    assert calls_number == 1
+    assert (program.hits, program.misses) == (199, 1)
+
+
+def test_waiting_for_a_hanging_stage_times_out_and_errors_are_not_cached():
+    release = threading.Event()
+    failures_number = 0
+
+    def stage(config, input, outputs):
+        nonlocal failures_number
+        if input == 'fail' and failures_number == 0:
+            failures_number += 1
+            raise ConnectionError("transient")
+        release.wait(5)
+        return input
+
+    program = StagedProgram(stages=[Stage(name='stage', function=stage, depends_on=['llm'])], wait_timeout=0.05)
+    config = Config(selector='random', llm='small')
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        hanging = executor.submit(program, config, 'q')
+        while not program.in_flight:  # the first call is computing the stage
+            time.sleep(0.001)
+        with pytest.raises(TimeoutError):
+            program(config, 'q')
+        release.set()
+        assert hanging.result() == 'q'
+
+    with pytest.raises(ConnectionError):
+        program(config, 'fail')
+    assert program(config, 'fail') == 'fail'
+
+
+def test_depends_on_is_validated_when_the_stage_is_built():
+    with pytest.raises(ValidationError, match="llm_name"):
+        Stage(name='answer', function=lambda config, input, outputs: input, depends_on=['llm_name'], config_class=Config)
@@ -0,0 +1,78 @@
+import random
+import statistics as exact_statistics
+
+from pydantic import BaseModel
+
+from meta_config_wiz.program_runner.online_statistics import OnlineStatistics
+from meta_config_wiz.program_runner.program_runner_factory import program_runner_factory
+
+
+class Config(BaseModel):
+    accuracy: float
+
+
+def program(config: Config, input: int) -> bool:
+    return random.Random(input).random() < config.accuracy
+
+
+def score(output: bool, expected: bool) -> float:
+    return float(output == expected)
+
+
+dataset = [(i, True) for i in range(400)]
+
+
+def test_online_statistics_match_exact_statistics():
+    values = [random.Random(seed).gauss(0, 1) for seed in range(2000)]
+    online = OnlineStatistics(quantiles=(0.1, 0.5, 0.9))
+    for value in values:
+        online.add(value)
+    assert abs(online.mean - exact_statistics.mean(values)) < 1e-9
+    assert abs(online.variance - exact_statistics.variance(values)) < 1e-9
+    deciles = exact_statistics.quantiles(values, n=10)
+    assert abs(online.quantile(0.1) - deciles[0]) < 0.1
+    assert abs(online.quantile(0.5) - deciles[4]) < 0.1
+    assert abs(online.quantile(0.9) - deciles[8]) < 0.1
+
+
+def test_streaming_mean_equals_all_mean():
+    streaming = program_runner_factory('StreamingMean', {'max_in_flight': 8})
+    all_mean = program_runner_factory('AllMean')
+    assert abs(streaming.run(Config(accuracy=0.7), program, dataset, score) - all_mean.run(Config(accuracy=0.7), program, dataset, score)) < 1e-9
+    assert streaming.partial_results[Config(accuracy=0.7).model_dump_json()].count == len(dataset)
+
+
+def test_hopeless_configurations_stop_early():
+    calls: list[int] = []
+
+    def counted_program(config: Config, input: int) -> bool:
+        calls.append(input)
+        return program(config, input)
+
+    runner = program_runner_factory('StreamingMean', {'max_in_flight': 4, 'early_stopping_z': 2, 'min_samples': 20})
+    assert runner.run(Config(accuracy=0.9), counted_program, dataset, score) > 0.8
+    assert len(calls) == len(dataset)
+
+    calls.clear()
+    partial_mean = runner.run(Config(accuracy=0.2), counted_program, dataset, score)
+    assert partial_mean < 0.5
+    assert len(calls) < len(dataset) // 4
+    assert runner.stopped_configs == {Config(accuracy=0.2).model_dump_json()}
+
+    # a configuration that is not confidently worse is evaluated on all the samples
+    calls.clear()
+    runner.run(Config(accuracy=0.95), counted_program, dataset, score)
+    assert len(calls) == len(dataset)
+
+
+def test_partial_result_callback_can_stop_the_evaluation():
+    reports: list[int] = []
+
+    def on_partial_result(config: Config, statistics: OnlineStatistics) -> bool:
+        reports.append(statistics.count)
+        return statistics.count >= 30
+
+    runner = program_runner_factory('StreamingMean', {'max_in_flight': 1, 'on_partial_result': on_partial_result, 'report_every': 10})
+    runner.run(Config(accuracy=0.5), program, dataset, score)
+    assert reports == [10, 20, 30]
+    assert runner.partial_results[Config(accuracy=0.5).model_dump_json()].count == 30
@@ -0,0 +1,52 @@
+import random
+from typing import Literal
+
+import pytest
+from pydantic import BaseModel, Field
+
+from meta_config_wiz.strategy.strategy_factory import strategy_factory
+from meta_config_wiz.strategy.surrogate.surrogate_factory import surrogate_factory
+
+
+class Config(BaseModel):
+    style: Literal['short', 'long', 'detailed']
+    temperature: float = Field(ge=0, le=1)
+    examples: int = Field(ge=0, le=10)
+    verbose: bool
+
+
+def score(config: Config) -> float:
+    return (config.style == 'detailed') - abs(config.temperature - 0.3) - abs(config.examples - 7) / 10 + 0.2 * config.verbose
+
+
+@pytest.mark.parametrize("surrogate_name", ['TPE', 'RandomForest', 'ExtraTrees'])
+def test_suggestions_are_valid_and_new(surrogate_name):
+    surrogate = surrogate_factory(surrogate_name, Config)
+    for config_dict in surrogate.sample_random(10):
+        surrogate.observe(config_dict, score(Config(**config_dict)))
+    for _ in range(5):
+        suggestion = surrogate.suggest()
+        config = Config(**suggestion)
+        assert suggestion not in surrogate.observations
+        surrogate.observe(suggestion, score(config))
+
+
+@pytest.mark.parametrize("surrogate_name", ['TPE', 'RandomForest'])
+def test_surrogate_search_beats_random_search(surrogate_name):
+    best_scores: dict[str, list[float]] = {'surrogate': [], 'random': []}
+    for seed in range(3):
+        surrogate = strategy_factory('BayesianStrategy', Config, max_runs=40,
+                                     strategy_kwargs={'surrogate': surrogate_name, 'surrogate_kwargs': {'random_state': seed}})
+        surrogate.run_strategy(score)
+        best_scores['surrogate'].append(max(surrogate.scores))
+        random.seed(seed)  # the random strategy samples the categorical values with the random module
+        random_strategy = strategy_factory('RandomStrategy', Config, max_runs=40)
+        random_strategy.run_strategy(score)
+        best_scores['random'].append(max(random_strategy.scores))
+    assert sum(best_scores['surrogate']) >= sum(best_scores['random'])
+    assert len(surrogate.configs) == 40
+
+
+def test_unknown_surrogate_is_rejected():
+    with pytest.raises(ValueError):
+        surrogate_factory('GP', Config)
@@ -0,0 +1,74 @@
+import json
+from typing import Literal
+
+import pytest
+from pydantic import BaseModel, Field
+
+from meta_config_wiz.strategy.abstract_strategy import load_observations
+from meta_config_wiz.strategy.strategy_factory import strategy_factory
+
+
+class Config(BaseModel):
+    style: Literal['short', 'long', 'detailed']
+    examples: int = Field(ge=0, le=3)
+
+
+def score(config: Config) -> float:
+    # negative scores, so multiplying them by a discount would make stale configurations look better
+    return -abs(config.examples - 2) - (config.style != 'long')
+
+
+@pytest.mark.parametrize("surrogate", ['GP', 'TPE'])
+def test_nightly_warm_start_does_not_evaluate_prior_configurations(tmp_path, surrogate):
+    checkpoint = tmp_path / "checkpoint.json"
+    prior_observations = None
+    for night in range(3):
+        evaluated: list[Config] = []
+
+        def func(config: Config) -> float:
+            evaluated.append(config)
+            return score(config)
+
+        strategy = strategy_factory('BayesianStrategy', Config, max_runs=8,
+                                    strategy_kwargs={'surrogate': surrogate, 'prior_observations': prior_observations, 'prior_discount': 0.9})
+        strategy.run_strategy(func)
+        assert not any(strategy.is_prior_config(config) for config in evaluated)
+        assert len({config.model_dump_json() for config in evaluated}) == len(evaluated)
+        strategy.save_observations(str(checkpoint))
+
+        saved = json.loads(checkpoint.read_text())
+        assert len({json.dumps(observation["config"], sort_keys=True) for observation in saved}) == len(saved)
+        prior_observations = load_observations(str(checkpoint))
+
+
+def test_prior_weights_age_and_scores_are_not_discounted(tmp_path):
+    strategy = strategy_factory('RandomStrategy', Config, max_runs=3, strategy_kwargs={
+        'prior_observations': [({'style': 'long', 'examples': 2}, -0.5, 0.5), ({'style': 'short', 'examples': 0}, -3.0)],
+        'prior_discount': 0.8,
+    })
+    assert strategy.prior_weights == [0.4, 0.8]
+    strategy.run_strategy(lambda config: -10.0)
+    assert strategy.choose_best_config() == Config(style='long', examples=2)
+
+    checkpoint = tmp_path / "checkpoint.json"
+    strategy.save_observations(str(checkpoint))
+    observations = {json.dumps(config, sort_keys=True): (score, weight) for config, score, weight in load_observations(str(checkpoint))}
+    assert observations[json.dumps({'style': 'long', 'examples': 2}, sort_keys=True)] == (-0.5, 0.4)
+    assert observations[json.dumps(strategy.configs[0].model_dump(), sort_keys=True)] == (-10.0, 1.0)
+
+
+def test_load_observations_reads_old_checkpoints_once(tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    checkpoint.write_text(json.dumps([
+        {"config": {"style": "long", "examples": 1}, "score": 0.5},
+        {"config": {"examples": 1, "style": "long"}, "score": 0.3},
+    ]))
+    assert load_observations(str(checkpoint)) == [({"style": "long", "examples": 1}, 0.5, 1.0)]
+
+
+def test_equivalent_prior_observations_are_kept_once():
+    strategy = strategy_factory('GridStrategy', Config, max_runs=20, strategy_kwargs={
+        'prior_observations': [({'style': 'long', 'examples': 1}, 0.5), (Config(style='long', examples=1), 0.3)],
+    })
+    assert strategy.prior_scores == [0.5]
+    assert len(strategy.configs) == 11
@@ -2,6 +2,7 @@ from random import random
 from meta_config_wiz.applications.text2sql import Text2SQLConfiguration
 from meta_config_wiz import MetaPromptWiz
 from meta_config_wiz.program_runner.program_runner import InputType, OutputType
+from meta_config_wiz.program_runner.staged_program import StagedProgram, Stage
 from meta_config_wiz.applications.text2sql import Text2SQLSampleScore, Text2SQLConfigurationScore
 from meta_config_wiz.strategy.evalautor import ConfigurationEvaluator, SampleEvaluator
 
@@ -47,14 +48,29 @@ class TextToSQLEvaluator(SampleEvaluator):
         )
 
 
-def run_text2sql(conf: Text2SQLConfiguration, dummy_input: InputType) -> OutputType:
-    """ "
-    Runs configuration on an evaluation benchmark, and returns evaluation measures
+def select_examples(conf: Text2SQLConfiguration, question: InputType, outputs: dict) -> list[str]:
+    """
+    Selects the few-shot examples for the question. depends only on example_selector and examples_number
+    """
+    # stub implementation
+    return [f"{conf.example_selector}_example_{i}" for i in range(conf.examples_number)]
+
+
+def generate_sql(conf: Text2SQLConfiguration, question: InputType, outputs: dict) -> OutputType:
+    """
+    Prompts the LLM with the question and the selected examples, and returns the generated SQL query
     """
     #  generate random string
     return "SELECT * FROM table WHERE column = '{value}'".format(value=random())
 
 
+# the program is declared as stages, so the examples selected for a question are reused by all configurations with the same example_selector and examples_number
+run_text2sql = StagedProgram(stages=[
+    Stage(name="examples", function=select_examples, depends_on=["example_selector", "examples_number"], config_class=Text2SQLConfiguration),
+    Stage(name="sql", function=generate_sql, depends_on=["prompt_style", "llm", "error_correction"], config_class=Text2SQLConfiguration),
+])
+
+
 # Example usage, using a mock program that generates random SQL queries and a mock evaluator that generates random scores
 my_config_wiz = MetaPromptWiz[Text2SQLConfiguration, str, str](
     config_class=Text2SQLConfiguration, program=run_text2sql
@@ -71,3 +87,4 @@ best_config: Text2SQLConfiguration = my_config_wiz.find_best_configuration(
 )
 
 print(best_config)
+print(f"stage cache hits: {run_text2sql.hits}, misses: {run_text2sql.misses}")